@@ -0,0 +1,125 @@
+"""Throughput comparison of the audio generator's device and precision modes.
+
+Generates the same prompts with StableAudio in each mode (GPU float16,
+CPU float32, CPU bfloat16, CPU float32 with an int8 transformer) and
+writes the load time, seconds per waveform, waveforms/hour and realtime
+factor of each to a JSON file. It needs the model weights; a GPU mode is
+skipped on machines without CUDA. Run it from the autoplay directory:
+
+    python -m benchmarks.bench_audio --modes cpu-fp32 cpu-int8 --output audio.json
+    python -m benchmarks.bench_audio --compare before.json after.json
+"""
+import argparse
+import gc
+import json
+import logging
+import platform
+import sys
+import time
+import torch
+from benchmarks.results import compare, git_revision, peak_rss_mb
+from sound.audio import AUDIO_MODEL_ID, configure_cpu_threads, generate_waveforms, load_audio_pipeline
+
+MODES = {
+    'gpu-fp16': {'device': 'cuda', 'dtype': 'float16', 'quantize': False},
+    'cpu-fp32': {'device': 'cpu', 'dtype': 'float32', 'quantize': False},
+    'cpu-bf16': {'device': 'cpu', 'dtype': 'bfloat16', 'quantize': False},
+    'cpu-int8': {'device': 'cpu', 'dtype': 'float32', 'quantize': True},
+}
+
+PROMPTS = [
+    "Door slam in a large empty hall",
+    "Footsteps on gravel",
+    "Glass shattering on a tiled floor",
+    "Short sci-fi laser blast",
+]
+
+
+def bench_mode(mode, args):
+    """Loads the pipeline for one mode, warms it up and times args.rounds generations of the prompts."""
+    settings = MODES[mode]
+    if settings['device'] == 'cuda' and not torch.cuda.is_available():
+        return {"skipped": "CUDA is not available"}
+
+    start = time.perf_counter()
+    pipe = load_audio_pipeline(args.model, **settings)
+    load_s = time.perf_counter() - start
+    if args.threads and settings['device'] == 'cpu':
+        configure_cpu_threads(args.threads)
+
+    prompts = [PROMPTS[index % len(PROMPTS)] for index in range(args.batch_size)]
+    seeds = list(range(args.batch_size))
+
+    def generate():
+        generate_waveforms(pipe, prompts, seeds, "", args.steps, args.duration)
+        if settings['device'] == 'cuda':
+            torch.cuda.synchronize()
+
+    generate()  # Warm-up: kernel selection and allocator growth are not counted
+    timings = []
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        generate()
+        timings.append(time.perf_counter() - start)
+
+    del pipe
+    gc.collect()
+    if settings['device'] == 'cuda':
+        torch.cuda.empty_cache()
+
+    waveforms = args.rounds * args.batch_size
+    seconds_per_waveform = sum(timings) / waveforms
+    return {
+        "load_s": load_s,
+        "seconds_per_waveform": seconds_per_waveform,
+        "waveforms_per_hour": 3600 / seconds_per_waveform,
+        "realtime_factor": args.duration / seconds_per_waveform,  # Seconds of audio per second of compute
+        "threads": torch.get_num_threads() if settings['device'] == 'cpu' else None,
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Compare audio generation throughput across devices and precisions")
+    parser.add_argument('--output', help="Write the JSON results to this file (default: stdout)")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help="Compare two result files and exit")
+    parser.add_argument('--model', default=AUDIO_MODEL_ID)
+    parser.add_argument('--modes', nargs='+', choices=sorted(MODES), default=sorted(MODES))
+    parser.add_argument('--steps', type=int, default=20, help="Inference steps per waveform")
+    parser.add_argument('--duration', type=float, default=5.0, help="Seconds of audio per waveform")
+    parser.add_argument('--batch-size', type=int, default=4, help="Waveforms per pipeline call")
+    parser.add_argument('--rounds', type=int, default=2, help="Timed pipeline calls per mode")
+    parser.add_argument('--threads', type=int, help="CPU threads (default: one per physical core)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    logging.basicConfig(level=logging.INFO)
+    results = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "parameters": {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        "modes": {mode: bench_mode(mode, args) for mode in args.modes},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        for mode, result in results["modes"].items():
+            summary = result.get("skipped") or f"{result['waveforms_per_hour']:.1f} waveforms/hour"
+            print(f"{mode}: {summary}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
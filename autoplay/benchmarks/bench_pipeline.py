@@ -0,0 +1,231 @@
+"""Throughput benchmark for the render path, driven by a stub model.
+
+Renders synthetic jobs through GenerationEngine with a StubPipeline and the
+real FFmpeg export stage, then writes videos/hour, per-stage latency, peak
+RSS, disk bytes written and scheduler throughput to a JSON file. Run it from
+the autoplay directory:
+
+    python -m benchmarks.bench_pipeline --output bench.json
+    python -m benchmarks.bench_pipeline --compare before.json after.json
+
+Clips are encoded straight from the frames, so there is no re-encode stage
+to time; the "reencode" entry is kept as null so older results still line up.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+from benchmarks.results import compare, git_revision, peak_rss_mb
+from benchmarks.stub_pipeline import stub_loader
+from core.cost_model import CostModel
+from core.engine import GenerationEngine
+from core.prompt_cache import PromptEmbeddingCache
+from core.video_encoder import FFmpegEncoder
+from services.pipeline_service import PROFILES, PipelineRegistry
+from utils.scheduler import POLICIES, JobScheduler
+
+
+class TimedEncoder(FFmpegEncoder):
+    """FFmpegEncoder that records how long each export takes and how many bytes it wrote."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self.timings = []
+        self.bytes_written = 0
+
+    def encode(self, frames, output_path):
+        start_time = time.perf_counter()
+        size = super().encode(frames, output_path)
+        with self._lock:
+            self.timings.append(time.perf_counter() - start_time)
+            self.bytes_written += size
+        return size
+
+
+def make_jobs(num_jobs, num_videos, num_frames, num_inference_steps, num_prompts):
+    """Synthetic queue items; prompts repeat every num_prompts jobs to exercise the prompt cache."""
+    return [
+        {
+            'project_name': f"bench{index % 3}",
+            'sequence_number': index + 1,
+            'text': f"benchmark prompt {index % num_prompts}",
+            'num_inference_steps': num_inference_steps,
+            'guidance_scale': 6.0,
+            'num_frames': num_frames,
+            'num_videos': num_videos,
+        }
+        for index in range(num_jobs)
+    ]
+
+
+def summarize(samples):
+    """Count, total, mean, median and max of a list of seconds."""
+    if not samples:
+        return {"count": 0, "total": 0.0, "mean": None, "p50": None, "max": None}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "total": sum(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "max": ordered[-1],
+    }
+
+
+def bench_render(args):
+    """Renders the synthetic jobs and returns the render section of the results."""
+    loaded = []
+    registry = PipelineRegistry(loader=stub_loader(
+        load_delay=args.load_delay,
+        loaded=loaded,
+        step_delay=args.step_delay,
+        decode_delay=args.decode_delay,
+        encode_delay=args.encode_delay,
+        height=args.height,
+        width=args.width,
+    ))
+    encoder = TimedEncoder(preset=args.preset)
+    jobs = make_jobs(args.jobs, args.videos, args.frames, args.steps, args.prompts)
+
+    with tempfile.TemporaryDirectory(prefix="autoplay-bench-") as output_dir:
+        engine = GenerationEngine(
+            output_dir,
+            profile=args.profile,
+            batch_size=args.batch_size,
+            encoder=encoder,
+            export_depth=args.export_depth,
+            registry=registry,
+            prompt_cache=PromptEmbeddingCache(),
+            cost_model=CostModel(path=None),  # Keep stub timings out of the real history
+        )
+        job_times = []
+
+        def on_event(event):
+            if event.kind == "job_finished":
+                job_times.append(event.data[0])
+
+        start_time = time.perf_counter()
+        done, failed = engine.run(jobs, callback=on_event)
+        wall_time = time.perf_counter() - start_time
+        disk_bytes = sum(entry.stat().st_size for entry in os.scandir(output_dir) if entry.is_file())
+
+    if not loaded:
+        raise RuntimeError("the stub pipeline was never loaded, so there are no stage timings to report")
+    pipe = loaded[0]
+    videos = done * args.videos
+    return {
+        "jobs_done": done,
+        "jobs_failed": failed,
+        "videos": videos,
+        "wall_time": wall_time,
+        "videos_per_hour": videos / wall_time * 3600 if wall_time else None,
+        "stages": {
+            "load": summarize([engine.load_time]),
+            "encode_prompt": summarize(pipe.timings["encode_prompt"]),
+            "denoise": summarize(pipe.timings["denoise"]),
+            "decode": summarize(pipe.timings["decode"]),
+            "export": summarize(encoder.timings),
+            "reencode": None,
+            "job": summarize(job_times),
+        },
+        "disk_bytes_written": disk_bytes,
+        "encoder_bytes": encoder.bytes_written,
+    }
+
+
+def bench_queue(num_items):
+    """Push and pop rates of the scheduler for every policy."""
+    items = [
+        {
+            'project_name': f"project{index % 7}",
+            'panel_id': index % 5,
+            'priority': index % 3,
+            'num_frames': 49,
+            'num_inference_steps': 10 + index % 40,
+            'num_videos': 1 + index % 4,
+        }
+        for index in range(num_items)
+    ]
+    results = {}
+    for policy in POLICIES:
+        scheduler = JobScheduler(policy)
+        start_time = time.perf_counter()
+        for item in items:
+            scheduler.push(item)
+        push_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        while scheduler.pop() is not None:
+            pass
+        pop_time = time.perf_counter() - start_time
+        results[policy] = {
+            "push_per_second": num_items / push_time if push_time else None,
+            "pop_per_second": num_items / pop_time if pop_time else None,
+        }
+    return results
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the render path with a stub model")
+    parser.add_argument('--output', help="Write the JSON results to this file (default: stdout)")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help="Compare two result files and exit")
+    parser.add_argument('--jobs', type=int, default=4)
+    parser.add_argument('--videos', type=int, default=2, help="Videos per job")
+    parser.add_argument('--frames', type=int, default=49)
+    parser.add_argument('--steps', type=int, default=20)
+    parser.add_argument('--prompts', type=int, default=2, help="Distinct prompts across the jobs")
+    parser.add_argument('--height', type=int, default=480, help="Height of the stub frames")
+    parser.add_argument('--width', type=int, default=720, help="Width of the stub frames")
+    parser.add_argument('--load-delay', type=float, default=0.5, help="Seconds the stub takes to load")
+    parser.add_argument('--step-delay', type=float, default=0.02, help="Seconds per denoising step")
+    parser.add_argument('--decode-delay', type=float, default=0.1, help="Seconds of decode per video")
+    parser.add_argument('--encode-delay', type=float, default=0.05, help="Seconds per text-encoder call")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='low-memory')
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--export-depth', type=int, default=2)
+    parser.add_argument('--preset', default='ultrafast', help="x264 preset used for the exports")
+    parser.add_argument('--queue-items', type=int, default=10000, help="Items for the scheduler benchmark")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    logging.basicConfig(level=logging.WARNING)
+    try:
+        render = bench_render(args)
+    except RuntimeError as e:
+        print(f"Render benchmark failed: {e}", file=sys.stderr)
+        return 1
+    results = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "parameters": {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        "render": render,
+        "queue": bench_queue(args.queue_items),
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_child_rss_mb": peak_rss_mb(resource.RUSAGE_CHILDREN),  # FFmpeg processes
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"Wrote {args.output}: {results['render']['videos_per_hour']:.1f} videos/hour")
+    else:
+        print(output)
+    return 0 if results["render"]["jobs_failed"] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
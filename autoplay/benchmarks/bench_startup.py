@@ -0,0 +1,194 @@
+"""Startup benchmark for the GUI.
+
+Imports the main window in a fresh interpreter under ``-X importtime`` and
+reports the total import time, the heaviest modules and whether any of the
+heavy dependencies (torch, diffusers, matplotlib, cv2, openai) were loaded
+before the window could paint. With --window it also times the window to
+its first show on Qt's offscreen platform, how long the background
+pre-warming takes after that, and the longest the GUI thread stalled
+meanwhile. Run it from the autoplay directory:
+
+    python -m benchmarks.bench_startup --output startup.json
+    python -m benchmarks.bench_startup --compare before.json after.json
+
+It exits with status 1 when a heavy module is imported at startup, the
+import time exceeds --budget-ms or the GUI stall exceeds --stall-budget-ms,
+so it can guard against regressions.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from benchmarks.results import compare, git_revision
+
+STARTUP_MODULE = 'ui.main_window'
+HEAVY_MODULES = ('torch', 'diffusers', 'transformers', 'matplotlib', 'cv2', 'openai')
+AUTOPLAY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WINDOW_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+from ui.main_window import TextToVideoGUI
+imported = time.perf_counter()
+app = QApplication(sys.argv)
+window = TextToVideoGUI()
+window.show()
+app.processEvents()
+shown = time.perf_counter()
+
+# The longest gap between 10 ms ticks is the longest the GUI thread was blocked
+ticks = {"last": time.perf_counter(), "stall": 0.0}
+def tick():
+    now = time.perf_counter()
+    ticks["stall"] = max(ticks["stall"], now - ticks["last"])
+    ticks["last"] = now
+timer = QTimer()
+timer.timeout.connect(tick)
+timer.start(10)
+while window.prewarmer.isRunning():
+    app.processEvents()
+    time.sleep(0.001)
+prewarmed = time.perf_counter()
+settle = prewarmed + %(settle_s)s  # Lets the resource monitor take its first samples
+while time.perf_counter() < settle:
+    app.processEvents()
+    time.sleep(0.001)
+if window.resource_monitor is not None:
+    window.resource_monitor.close()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_show_ms": (shown - start) * 1000,
+    "prewarmed_ms": (prewarmed - start) * 1000,
+    "max_gui_stall_ms": ticks["stall"] * 1000,
+}))
+"""
+
+
+def parse_importtime(stderr):
+    """Maps each imported module to (self us, cumulative us, depth) from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # The column header
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules[name.strip()] = (int(fields[0]), int(fields[1]), depth)
+    return modules
+
+
+def measure_imports(module):
+    """Imports module in a fresh interpreter; returns the wall time in ms and the parsed import times."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=AUTOPLAY_DIR, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    return wall_ms, parse_importtime(result.stderr)
+
+
+def bench_imports(module, runs, top):
+    """Median import time over runs, with the heaviest and the heavy modules of the median run."""
+    samples = []
+    for _ in range(runs):
+        wall_ms, modules = measure_imports(module)
+        total_ms = sum(cumulative for _, cumulative, depth in modules.values() if depth == 0) / 1000
+        samples.append((total_ms, wall_ms, modules))
+    samples.sort(key=lambda sample: sample[0])
+    total_ms, wall_ms, modules = samples[len(samples) // 2]
+
+    # Only top-level packages, so torch is not listed once per submodule
+    packages = {name: times for name, times in modules.items() if '.' not in name}
+    heaviest = sorted(packages.items(), key=lambda entry: -entry[1][1])[:top]
+    return {
+        "total_ms": total_ms,
+        "wall_ms": statistics.median(sample[1] for sample in samples),
+        "modules": len(modules),
+        "heaviest": [{"module": name, "cumulative_ms": times[1] / 1000} for name, times in heaviest],
+        "heavy_imported": sorted(name for name in HEAVY_MODULES if name in modules),
+    }
+
+
+def bench_window(settle_s=2.0):
+    """Times the main window to its first show and to the end of pre-warming, offscreen.
+
+    Also reports the longest the GUI thread was blocked while the heavy
+    modules loaded and the resource monitor opened and started sampling.
+    """
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen', AUTOPLAY_PREWARM='1')
+    result = subprocess.run(
+        [sys.executable, '-c', WINDOW_SCRIPT % {'settle_s': settle_s}],
+        cwd=AUTOPLAY_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Opening the main window failed:\n{result.stderr.strip()}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark GUI startup imports")
+    parser.add_argument('--output', help="Write the JSON results to this file (default: stdout)")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help="Compare two result files and exit")
+    parser.add_argument('--module', default=STARTUP_MODULE, help="Module imported at startup")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters to time; the median is reported")
+    parser.add_argument('--top', type=int, default=15, help="Heaviest packages to list")
+    parser.add_argument('--window', action='store_true', help="Also time the window to its first show")
+    parser.add_argument('--budget-ms', type=float, help="Fail when the import time exceeds this")
+    parser.add_argument('--stall-budget-ms', type=float, help="With --window, fail when the GUI thread stalls longer")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    results = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "parameters": {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        "imports": bench_imports(args.module, args.runs, args.top),
+    }
+    if args.window:
+        results["window"] = bench_window()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"Wrote {args.output}: {results['imports']['total_ms']:.0f} ms to import {args.module}")
+    else:
+        print(output)
+
+    failed = False
+    heavy = results["imports"]["heavy_imported"]
+    if heavy:
+        print(f"Heavy modules imported at startup: {', '.join(heavy)}", file=sys.stderr)
+        failed = True
+    if args.budget_ms is not None and results["imports"]["total_ms"] > args.budget_ms:
+        print(f"Startup imports took {results['imports']['total_ms']:.0f} ms, over the {args.budget_ms:.0f} ms budget",
+              file=sys.stderr)
+        failed = True
+    stall_ms = results.get("window", {}).get("max_gui_stall_ms")
+    if args.stall_budget_ms is not None and stall_ms is not None and stall_ms > args.stall_budget_ms:
+        print(f"The GUI thread stalled for {stall_ms:.0f} ms, over the {args.stall_budget_ms:.0f} ms budget",
+              file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
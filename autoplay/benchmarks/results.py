@@ -0,0 +1,45 @@
+"""Helpers shared by the benchmark scripts for stamping, measuring and comparing JSON results."""
+import json
+import resource
+import subprocess
+import sys
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def flatten(results, prefix=""):
+    """Maps dotted paths to the numeric leaves of a results dict."""
+    values = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            values.update(flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[path] = value
+    return values
+
+
+def compare(before_path, after_path):
+    """Prints every numeric result of two benchmark files side by side with the change in percent."""
+    with open(before_path, encoding='utf-8') as f:
+        before = flatten(json.load(f))
+    with open(after_path, encoding='utf-8') as f:
+        after = flatten(json.load(f))
+    width = max((len(path) for path in before.keys() | after.keys()), default=0)
+    for path in sorted(before.keys() & after.keys()):
+        old, new = before[path], after[path]
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        print(f"{path:<{width}}  {old:>14.4f}  {new:>14.4f}  {change:>8}")
@@ -0,0 +1,76 @@
+import threading
+import time
+import numpy as np
+import torch
+
+
+class StubOutput:
+    def __init__(self, frames):
+        self.frames = frames
+
+
+class StubPipeline:
+    """Deterministic stand-in for CogVideoXPipeline.
+
+    Sleeps for a configurable time per denoising step and per decoded video
+    and returns synthetic uint8 frames derived from each generator's seed, so
+    the render path can be benchmarked on a CPU without downloading a model.
+    """
+
+    name_or_path = "stub"
+
+    def __init__(self, step_delay=0.02, decode_delay=0.1, encode_delay=0.05, height=480, width=720):
+        self.step_delay = step_delay  # Seconds per denoising step, per call
+        self.decode_delay = decode_delay  # Seconds of VAE decode per video
+        self.encode_delay = encode_delay  # Seconds per text-encoder call
+        self.height = height
+        self.width = width
+        self._execution_device = torch.device("cpu")
+        self._lock = threading.Lock()
+        self.timings = {"encode_prompt": [], "denoise": [], "decode": []}
+
+    def encode_prompt(self, prompt, do_classifier_free_guidance=False, num_videos_per_prompt=1, max_sequence_length=226, **kwargs):
+        start_time = time.perf_counter()
+        time.sleep(self.encode_delay)
+        prompt_embeds = torch.zeros(num_videos_per_prompt, max_sequence_length, 16)
+        self._record("encode_prompt", time.perf_counter() - start_time)
+        return prompt_embeds, None
+
+    def __call__(self, num_inference_steps=50, num_frames=49, generator=None, callback_on_step_end=None, **kwargs):
+        generators = generator if isinstance(generator, list) else [generator]
+
+        start_time = time.perf_counter()
+        for step in range(num_inference_steps):
+            time.sleep(self.step_delay)
+            if callback_on_step_end is not None:
+                callback_on_step_end(self, step, step, {})
+        denoise_end = time.perf_counter()
+
+        time.sleep(self.decode_delay * len(generators))
+        frames = [self.make_frames(g.initial_seed() if g is not None else 0, num_frames) for g in generators]
+        self._record("denoise", denoise_end - start_time)
+        self._record("decode", time.perf_counter() - denoise_end)
+        return StubOutput(frames)
+
+    def make_frames(self, seed, num_frames):
+        """A noise image scrolled sideways, so frames differ but stay compressible."""
+        base = np.random.default_rng(seed).integers(0, 256, size=(self.height, self.width, 3), dtype=np.uint8)
+        return [np.roll(base, shift=index * 4, axis=1) for index in range(num_frames)]
+
+    def _record(self, stage, seconds):
+        with self._lock:
+            self.timings[stage].append(seconds)
+
+
+def stub_loader(load_delay=0.5, loaded=None, **stub_kwargs):
+    """Returns a PipelineRegistry loader that builds a StubPipeline after load_delay seconds.
+
+    Every pipeline it builds is appended to loaded when a list is given.
+    """
+    def load(model_id=None, torch_dtype=None, scheduler=None, profile=None):
+        time.sleep(load_delay)
+        pipe = StubPipeline(**stub_kwargs)
+        if loaded is not None:
+            loaded.append(pipe)
+        return pipe
+    return load
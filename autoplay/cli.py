@@ -0,0 +1,242 @@
+"""Headless batch runner for the render queue.
+
+Reads a JSONL job file (one queue item per line, the same dicts that
+PromptPanel.add_to_queue builds) and renders it without importing Qt or
+matplotlib, printing progress and timing as it goes.
+
+    python cli.py jobs.jsonl --output-dir vids
+
+Jobs are recorded in the output directory's job store; after a crash,
+`python cli.py --resume --output-dir vids` continues where it stopped.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from core.cost_model import get_cost_model
+from core.engine import GenerationEngine, catalogue_video, record_video, render_on_devices
+from core.render_job import VIDEO_HEIGHT, VIDEO_WIDTH
+from core.video_encoder import FFmpegEncoder
+from services.pipeline_service import PROFILES
+from utils.catalog import Catalog
+from utils.job_store import JobStore
+from utils.scheduler import POLICIES, JobScheduler
+from utils.tracing import PROFILERS, configure_tracing
+
+REQUIRED_KEYS = ('project_name', 'text', 'num_inference_steps', 'guidance_scale', 'num_frames', 'num_videos')
+
+
+def load_jobs(path):
+    """Parses the job file, numbering items per project when sequence_number is missing."""
+    jobs = []
+    sequences = {}
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            item = json.loads(line)
+            missing = [key for key in REQUIRED_KEYS if key not in item]
+            if missing:
+                raise ValueError(f"{path}:{line_number}: missing {', '.join(missing)}")
+            project_name = item['project_name']
+            sequences[project_name] = item.get('sequence_number', sequences.get(project_name, 0) + 1)
+            item['sequence_number'] = sequences[project_name]
+            jobs.append(item)
+    return jobs
+
+
+class ProgressReporter:
+    """Prints engine events, records job states and finished videos, and collects the timing summary."""
+
+    def __init__(self, num_jobs, total_videos, job_store=None, catalog=None, profile=None):
+        self.num_jobs = num_jobs
+        self.job_store = job_store
+        self.catalog = catalog
+        self.profile = profile
+        self.total_videos = total_videos
+        self.jobs_started = 0
+        self.videos_done = 0
+        self.failures = 0
+        self.jobs = []
+
+    def __call__(self, event):
+        item = event.item
+        if event.kind == "job_started":
+            self.jobs_started += 1
+            if self.job_store is not None:
+                self.job_store.mark_running(item)
+            print(
+                f"[{self.jobs_started}/{self.num_jobs}] {self.name(item)}: {item['num_videos']} videos, "
+                f"{item['num_frames']} frames, {item['num_inference_steps']} steps",
+                flush=True,
+            )
+        elif event.kind == "progress":
+            print(f"  {self.name(item)}: {event.data[0]}%", flush=True)
+        elif event.kind == "time_estimate":
+            print(f"  {self.name(item)}: {event.data[0]}", flush=True)
+        elif event.kind == "video_generated":
+            path, generation_time = event.data
+            self.videos_done += 1
+            if self.job_store is not None:
+                record_video(self.job_store, item, path)
+            if self.catalog is not None:
+                # Engines in device worker processes each resolve their own profile
+                catalogue_video(self.catalog, item, path, generation_time, event.profile or self.profile)
+            print(f"  [{self.videos_done}/{self.total_videos}] {path} ({generation_time:.2f}s)", flush=True)
+        elif event.kind == "job_finished":
+            if self.job_store is not None:
+                self.job_store.mark_done(item)
+            self.jobs.append({"name": self.name(item), "wall_time": event.data[0], "num_videos": item['num_videos']})
+        elif event.kind == "job_failed":
+            self.failures += 1
+            if self.job_store is not None:
+                self.job_store.mark_failed(item, event.data[0])
+            self.jobs.append({"name": self.name(item), "error": event.data[0]})
+
+    @staticmethod
+    def name(item):
+        return f"{item['project_name']}_{item['sequence_number']}"
+
+
+def device_events(jobs, output_dir, devices, **engine_kwargs):
+    """Runs one engine process per device and yields their events as they arrive."""
+    manager = multiprocessing.Manager()
+    event_queue = manager.Queue()
+    runner = threading.Thread(
+        target=render_on_devices,
+        args=(jobs, output_dir, devices, event_queue),
+        kwargs=engine_kwargs,
+        daemon=True,
+    )
+    runner.start()
+    remaining = len(devices)
+    try:
+        while remaining:
+            try:
+                event = event_queue.get(timeout=1)
+            except queue.Empty:
+                if not runner.is_alive():
+                    break  # A worker died before reporting that it finished
+                continue
+            if event.kind == "finished":
+                remaining -= 1
+            else:
+                yield event
+        runner.join()
+    finally:
+        manager.shutdown()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Render a JSONL job file without the GUI.")
+    parser.add_argument('jobs', nargs='?', help="JSONL file with one queue item per line")
+    parser.add_argument('--output-dir', required=True, help="Directory the videos are written to")
+    parser.add_argument('--resume', action='store_true', help="Continue the unfinished jobs recorded in the output directory")
+    parser.add_argument('--profile', choices=sorted(PROFILES), help="Execution profile (auto-selected by default)")
+    parser.add_argument('--batch-size', type=int, help="Videos per pipeline call (profile default)")
+    parser.add_argument('--export-depth', type=int, default=2, help="Clips that may wait for encoding at once")
+    parser.add_argument('--policy', choices=POLICIES, default=POLICIES[0], help="Order in which jobs are rendered")
+    parser.add_argument('--devices', help="Comma-separated CUDA devices, one engine process each (e.g. 0,1)")
+    parser.add_argument('--codec', default='libx264')
+    parser.add_argument('--crf', type=int, default=None, help="x264 quality (default: the codec's, 23 for libx264)")
+    parser.add_argument('--preset', default='medium')
+    parser.add_argument('--fps', type=int, default=8)
+    parser.add_argument('--summary', help="Write a JSON timing summary to this file")
+    parser.add_argument('--trace', help="Append per-job stage timings to this file (.json for Chrome trace format, otherwise JSONL)")
+    parser.add_argument('--trace-profiler', choices=PROFILERS, help="Also capture a profile of every job next to the trace")
+    args = parser.parse_args(argv)
+    if not args.jobs and not args.resume:
+        parser.error("a job file is required unless --resume is given")
+    if args.trace_profiler and not args.trace:
+        parser.error("--trace-profiler needs --trace")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.trace:
+        configure_tracing(args.trace, args.trace_profiler)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    job_store = JobStore.for_output_dir(args.output_dir)
+    jobs = job_store.unfinished_items() if args.resume else []
+    if args.resume:
+        print(f"Resuming {len(jobs)} unfinished jobs from {job_store.path}", flush=True)
+    if args.jobs:
+        new_jobs = load_jobs(args.jobs)
+        for item in new_jobs:
+            job_store.add(item)
+        jobs += new_jobs
+        print(f"Loaded {len(new_jobs)} jobs from {args.jobs}", flush=True)
+    total_videos = sum(item['num_videos'] for item in jobs)
+    print(f"{len(jobs)} jobs ({total_videos} videos) to render", flush=True)
+
+    scheduler = JobScheduler(args.policy)
+    for item in jobs:
+        scheduler.push(item)
+    jobs = list(iter(scheduler.pop, None))
+
+    engine_kwargs = dict(
+        profile=args.profile,
+        batch_size=args.batch_size,
+        encoder=FFmpegEncoder(codec=args.codec, crf=args.crf, preset=args.preset, fps=args.fps),
+        export_depth=args.export_depth,
+    )
+    catalog = Catalog.for_output_dir(args.output_dir)
+    reporter = ProgressReporter(len(jobs), total_videos, job_store=job_store, catalog=catalog, profile=args.profile)
+    summary = {}
+
+    run_start_time = time.time()
+    if args.devices:
+        devices = args.devices.split(',')
+        print(f"Rendering on devices {', '.join(devices)}", flush=True)
+        summary.update(devices=devices, profile=args.profile or "auto")
+        for event in device_events(jobs, args.output_dir, devices, **engine_kwargs):
+            reporter(event)
+    else:
+        engine = GenerationEngine(args.output_dir, **engine_kwargs)
+        reporter.profile = engine.profile
+        print(f"Profile: {engine.profile}, batch size: {engine.batch_size}", flush=True)
+        predicted = get_cost_model().predict_queue(jobs, VIDEO_HEIGHT, VIDEO_WIDTH, engine.profile)
+        if predicted:
+            print(f"Predicted render time: {predicted:.0f}s (from timing history)", flush=True)
+        summary["predicted_time"] = predicted
+        for event in engine.events(jobs):
+            reporter(event)
+        summary.update(profile=engine.profile, batch_size=engine.batch_size, load_time=engine.load_time)
+
+    total_time = time.time() - run_start_time
+    videos_per_hour = reporter.videos_done / total_time * 3600 if total_time else 0.0
+    summary.update(
+        total_time=total_time,
+        videos=reporter.videos_done,
+        failures=reporter.failures,
+        videos_per_hour=videos_per_hour,
+        jobs=reporter.jobs,
+    )
+    print(
+        f"Rendered {reporter.videos_done}/{total_videos} videos in {total_time:.2f}s "
+        f"({videos_per_hour:.1f} videos/hour, {reporter.failures} failed jobs)",
+        flush=True,
+    )
+
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+    job_store.close()
+    catalog.close()
+
+    failed = reporter.failures or reporter.jobs_started < len(jobs)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
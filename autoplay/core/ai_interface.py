@@ -0,0 +1,132 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from openai import AsyncOpenAI
+
+DEFAULT_MODEL = "gpt-4-turbo-preview"
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".autoplay", "prompt_expansions.json")
+
+SYSTEM_PROMPT = "You are a creative assistant that generates prompts for text-to-video AI models."
+SCENE_PROMPT = (
+    "Based on the following global intention, generate a creative and detailed prompt for this cinematic "
+    "CogVideoX-5b scene {scene} of a text-to-video AI model: {global_prompt}"
+)
+
+
+def expansion_key(global_prompt, scene_index, model):
+    return hashlib.sha256(json.dumps([global_prompt, scene_index, model]).encode('utf-8')).hexdigest()
+
+
+class PromptExpander:
+    """Expands a global prompt into one scene prompt per panel.
+
+    Scenes missing from the cache are requested concurrently with the async
+    OpenAI client, at most max_concurrency at a time. Every answer is stored
+    in a JSON cache keyed by (global prompt, scene index, model), so asking
+    again for the same project returns at once and a failed run only repeats
+    the scenes that failed. base_url (or OPENAI_BASE_URL) can point the client
+    at any OpenAI-compatible server, such as a local stand-in for testing.
+    """
+
+    def __init__(
+        self,
+        model=DEFAULT_MODEL,
+        max_concurrency=4,
+        cache_path=DEFAULT_CACHE_PATH,
+        base_url=None,
+        api_key=None,
+        client=None,
+    ):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.cache_path = cache_path
+        self.base_url = base_url
+        self.api_key = api_key
+        self.client = client  # None creates a client per expand() call, on that call's event loop
+        self._lock = threading.Lock()
+        self._cache = {}
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, encoding='utf-8') as f:
+                    self._cache = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable prompt expansion cache {cache_path}: {e}")
+
+    def expand(self, global_prompt, num_scenes):
+        """Returns num_scenes scene prompts; blocks, so call it off the GUI thread."""
+        return asyncio.run(self.expand_async(global_prompt, num_scenes))
+
+    async def expand_async(self, global_prompt, num_scenes):
+        with self._lock:
+            prompts = [self._cache.get(expansion_key(global_prompt, index, self.model)) for index in range(num_scenes)]
+        missing = [index for index, prompt in enumerate(prompts) if prompt is None]
+        if not missing:
+            return prompts
+
+        logging.info(f"Expanding {len(missing)} of {num_scenes} scenes with {self.model}")
+        client = self.client or AsyncOpenAI(
+            api_key=self.api_key or os.getenv("OPENAI_API_KEY"),
+            base_url=self.base_url or os.getenv("OPENAI_BASE_URL"),
+        )
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def expand_scene(index):
+            async with semaphore:
+                response = await client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": SCENE_PROMPT.format(scene=index + 1, global_prompt=global_prompt)},
+                    ],
+                )
+            return response.choices[0].message.content.strip()
+
+        try:
+            results = await asyncio.gather(*(expand_scene(index) for index in missing), return_exceptions=True)
+        finally:
+            if self.client is None:
+                await client.close()
+
+        # Keep whatever succeeded, so a retry only asks for the scenes that failed
+        errors = []
+        with self._lock:
+            for index, result in zip(missing, results):
+                if isinstance(result, Exception):
+                    errors.append(result)
+                else:
+                    prompts[index] = result
+                    self._cache[expansion_key(global_prompt, index, self.model)] = result
+        self.save()
+        if errors:
+            raise errors[0]
+        return prompts
+
+    def save(self):
+        if not self.cache_path:
+            return
+        with self._lock:
+            cache = json.dumps(self._cache, indent=2)
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            temp_path = f"{self.cache_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(cache)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            logging.warning(f"Failed to save prompt expansion cache {self.cache_path}: {e}")
+
+
+_prompt_expander = None
+_prompt_expander_lock = threading.Lock()
+
+
+def get_prompt_expander():
+    """Returns the process-wide expander; AUTOPLAY_PROMPT_MODEL overrides the model."""
+    global _prompt_expander
+    with _prompt_expander_lock:
+        if _prompt_expander is None:
+            _prompt_expander = PromptExpander(model=os.getenv("AUTOPLAY_PROMPT_MODEL", DEFAULT_MODEL))
+        return _prompt_expander
@@ -0,0 +1,114 @@
+import json
+import logging
+import os
+import threading
+
+DEFAULT_HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".autoplay", "timings.json")
+
+
+def timing_key(num_frames, num_inference_steps, height, width, profile):
+    return f"{num_frames}f/{num_inference_steps}s/{width}x{height}/{profile}"
+
+
+class CostModel:
+    """Predicts render time from a persisted history of denoising-step timings.
+
+    For every (frames, steps, resolution, profile) combination the model keeps
+    a moving average of the seconds one video spends per denoising step and of
+    the per-video overhead outside the loop (prompt encoding, VAE decode).
+    Unseen combinations are extrapolated from the same resolution and profile
+    by scaling with the frame count.
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH, smoothing=0.3):
+        self.path = path
+        self.smoothing = smoothing  # Weight of the newest sample in the moving average
+        self._lock = threading.Lock()
+        self._history = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self._history = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable timing history {path}: {e}")
+
+    def record(self, num_frames, num_inference_steps, height, width, profile, step_time, overhead):
+        """Adds one video's measured seconds per step and overhead to the history."""
+        key = timing_key(num_frames, num_inference_steps, height, width, profile)
+        with self._lock:
+            entry = self._history.get(key)
+            if entry is None:
+                entry = self._history[key] = {
+                    "num_frames": num_frames,
+                    "height": height,
+                    "width": width,
+                    "profile": profile,
+                    "step_time": step_time,
+                    "overhead": overhead,
+                    "samples": 0,
+                }
+            else:
+                entry["step_time"] += self.smoothing * (step_time - entry["step_time"])
+                entry["overhead"] += self.smoothing * (overhead - entry["overhead"])
+            entry["samples"] += 1
+
+    def predict_video(self, num_frames, num_inference_steps, height, width, profile):
+        """Returns (seconds per step, overhead) for one video, or None without history."""
+        with self._lock:
+            entry = self._history.get(timing_key(num_frames, num_inference_steps, height, width, profile))
+            if entry is not None:
+                return entry["step_time"], entry["overhead"]
+
+            # Step cost grows roughly linearly with the number of frames
+            similar = [
+                entry for entry in self._history.values()
+                if entry["profile"] == profile and entry["height"] == height and entry["width"] == width
+            ]
+        if not similar:
+            return None
+        scale = sum(num_frames / entry["num_frames"] for entry in similar) / len(similar)
+        step_time = sum(entry["step_time"] for entry in similar) / len(similar) * scale
+        overhead = sum(entry["overhead"] for entry in similar) / len(similar) * scale
+        return step_time, overhead
+
+    def predict_item(self, item, height, width, profile):
+        """Predicted seconds for a whole queue item, or None without history."""
+        prediction = self.predict_video(item['num_frames'], item['num_inference_steps'], height, width, profile)
+        if prediction is None:
+            return None
+        step_time, overhead = prediction
+        return (item['num_inference_steps'] * step_time + overhead) * item['num_videos']
+
+    def predict_queue(self, items, height, width, profile):
+        """Predicted seconds for several items; items without history are left out."""
+        return sum(
+            duration for duration in (self.predict_item(item, height, width, profile) for item in items)
+            if duration is not None
+        )
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            history = json.dumps(self._history, indent=2)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(history)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Failed to save timing history {self.path}: {e}")
+
+
+_cost_model = None
+_cost_model_lock = threading.Lock()
+
+
+def get_cost_model():
+    """Returns the process-wide cost model, stored at AUTOPLAY_TIMINGS or ~/.autoplay/timings.json."""
+    global _cost_model
+    with _cost_model_lock:
+        if _cost_model is None:
+            _cost_model = CostModel(os.getenv("AUTOPLAY_TIMINGS", DEFAULT_HISTORY_PATH))
+        return _cost_model
@@ -2,31 +2,42 @@ import subprocess
 import sys
 import logging
 from PyQt6.QtCore import QThread, pyqtSignal
+from utils.environment import REQUIREMENTS_PATH, EnvironmentCache, environment_key, read_manifest, unmet_requirements
+
 
 class DependencyInstaller(QThread):
-    """Thread for installing dependencies."""
+    """Thread that makes sure the render dependencies are installed.
+
+    Installed versions are read with importlib.metadata and compared with
+    the manifest; pip only runs for what is missing, in a single call. An
+    environment that passes is remembered by interpreter and requirements.txt
+    hash, so later batches skip the check entirely.
+    """
     finished = pyqtSignal()
     progress = pyqtSignal(int)
 
+    def __init__(self, requirements_path=REQUIREMENTS_PATH, cache=None):
+        super().__init__()
+        self.requirements_path = requirements_path
+        self.cache = cache or EnvironmentCache()
+
     def run(self):
-        """Install required dependencies."""
+        """Install the missing dependencies."""
         try:
-            dependencies = [
-                'torch',
-                'torchvision',
-                'torchaudio',
-                'transformers',
-                'diffusers>=0.30.0',
-                'accelerate',
-                'moviepy',
-                'opencv-python',
-                'sentencepiece',
-            ]
-            total = len(dependencies)
-            for i, dep in enumerate(dependencies, 1):
-                subprocess.check_call([sys.executable, "-m", "pip", "install", dep])
-                self.progress.emit(int((i / total) * 100))
-
+            manifest = read_manifest(self.requirements_path)
+            key = environment_key(self.requirements_path, manifest)
+            if not self.cache.is_verified(key):
+                missing = unmet_requirements(manifest)
+                if missing:
+                    logging.info(f"Installing missing dependencies: {', '.join(missing)}")
+                    self.progress.emit(10)
+                    subprocess.check_call([sys.executable, "-m", "pip", "install", *missing])
+                    still_missing = unmet_requirements(manifest)
+                    if still_missing:
+                        logging.error(f"Dependencies still missing after installing: {', '.join(still_missing)}")
+                        return
+                self.cache.mark_verified(key)
+            self.progress.emit(100)
             self.finished.emit()
         except subprocess.CalledProcessError as e:
             logging.error(f"Failed to install dependencies: {e}")
@@ -0,0 +1,242 @@
+import gc
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+import torch
+from core.export_pool import ExportPool
+from core.render_job import BASE_SEED, RenderJob
+from services.pipeline_service import PROFILES, get_registry, select_profile
+from utils.catalog import VIDEO_NAME
+from utils.tracing import get_tracer
+
+
+@dataclass
+class EngineEvent:
+    """Something that happened while rendering.
+
+    kind is one of job_started, progress, time_estimate, video_generated,
+    job_finished, job_failed or finished; data holds the kind's values and
+    profile the execution profile of the engine that emitted it.
+    """
+    kind: str
+    item: dict = None
+    data: tuple = field(default_factory=tuple)
+    profile: str = None
+
+
+class GenerationEngine:
+    """Pure-Python generation engine with a callback and event-iterator interface.
+
+    The engine owns the warm pipeline and the export pool and renders queue
+    items one after another. It has no Qt dependency, so it can be driven by a
+    QThread adapter, the CLI, asyncio or a multiprocessing worker.
+    """
+
+    def __init__(
+        self,
+        output_dir,
+        profile=None,
+        batch_size=None,
+        encoder=None,
+        export_depth=2,
+        registry=None,
+        job_store=None,
+        prompt_cache=None,
+        cost_model=None,
+        tracer=None,
+        catalog=None,
+    ):
+        self.output_dir = output_dir
+        self.profile = select_profile(profile)
+        self.batch_size = batch_size or PROFILES[self.profile]["batch_size"]
+        self.encoder = encoder
+        self.export_depth = export_depth
+        self.registry = registry or get_registry()
+        self.job_store = job_store  # Optional JobStore that records each item's state
+        self.prompt_cache = prompt_cache  # None uses the process-wide cache
+        self.cost_model = cost_model  # None uses the process-wide timing history
+        self.tracer = tracer or get_tracer()
+        self.catalog = catalog  # Optional Catalog that indexes finished videos with their prompt
+        self.pipe = None
+        self.export_pool = None
+        self.load_time = None
+
+    def start(self):
+        """Takes the pipeline from the registry and starts the export stage."""
+        if self.pipe is None:
+            start_time = time.time()
+            with self.tracer.span("load_pipeline", profile=self.profile):
+                self.pipe = self.registry.get(profile=self.profile)
+            self.load_time = time.time() - start_time
+        if self.export_pool is None:
+            self.export_pool = ExportPool(depth=self.export_depth)
+
+    def close(self):
+        """Waits for pending exports and releases cached GPU memory.
+
+        The pipeline itself stays warm in the registry for the next run.
+        """
+        if self.export_pool is not None:
+            self.export_pool.shutdown()
+            self.export_pool = None
+        self.pipe = None
+        self.registry.log_stats()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        gc.collect()
+
+    def event(self, kind, item=None, data=()):
+        """An EngineEvent carrying this engine's profile, which differs per worker process."""
+        return EngineEvent(kind, item, data, profile=self.profile)
+
+    def render(self, item, callback=None):
+        """Renders one queue item and returns its RenderJob; errors propagate."""
+        self.start()
+        emit = callback or _ignore
+        job = RenderJob.from_item(
+            item,
+            self.output_dir,
+            encoder=self.encoder,
+            batch_size=self.batch_size,
+            profile=self.profile,
+            prompt_cache=self.prompt_cache,
+            cost_model=self.cost_model,
+            tracer=self.tracer,
+        )
+        if self.job_store is not None:
+            self.job_store.mark_running(item)
+        emit(self.event("job_started", item))
+
+        def on_video_generated(path, generation_time):
+            if self.job_store is not None:
+                record_video(self.job_store, item, path)
+            if self.catalog is not None:
+                catalogue_video(self.catalog, item, path, generation_time, self.profile)
+            emit(self.event("video_generated", item, (path, generation_time)))
+
+        try:
+            job.run(
+                self.pipe,
+                on_progress=lambda progress: emit(self.event("progress", item, (progress,))),
+                on_time_estimate=lambda estimate: emit(self.event("time_estimate", item, (estimate,))),
+                on_video_generated=on_video_generated,
+                export_pool=self.export_pool,
+            )
+        except Exception as e:
+            if self.job_store is not None:
+                self.job_store.mark_failed(item, str(e))
+            raise
+        if self.job_store is not None:
+            self.job_store.mark_done(item)
+        emit(self.event("job_finished", item, (job.wall_time,)))
+        return job
+
+    def run(self, items, callback=None, should_stop=None):
+        """Renders items until they run out and returns (done, failed).
+
+        items is an iterable or a callable returning the next item or None,
+        such as QueueManager.get_next_item. A failing item is reported with a
+        job_failed event and skipped; should_stop is checked between items.
+        """
+        emit = callback or _ignore
+        items = iter(items, None) if callable(items) else iter(items)
+        done = failed = 0
+        try:
+            self.start()
+            while not (should_stop and should_stop()):
+                item = next(items, None)
+                if item is None:
+                    break
+                try:
+                    self.render(item, emit)
+                    done += 1
+                except Exception as e:
+                    failed += 1
+                    logging.error(f"Error generating video for {item['project_name']}: {e}")
+                    emit(self.event("job_failed", item, (str(e),)))
+        finally:
+            self.close()
+            emit(self.event("finished", None, (done, failed)))
+        return done, failed
+
+    def events(self, items, should_stop=None):
+        """Runs the engine on a background thread and yields its events as they happen."""
+        pending = queue.Queue()
+        thread = threading.Thread(target=self.run, args=(items, pending.put, should_stop), daemon=True)
+        thread.start()
+        while True:
+            event = pending.get()
+            yield event
+            if event.kind == "finished":
+                break
+        thread.join()
+
+
+def _ignore(event):
+    pass
+
+
+def video_index(path):
+    """Index of a video within its job, from the name RenderJob.output_path() gave it; None for other files."""
+    match = VIDEO_NAME.match(os.path.basename(path))
+    return int(match.group('index')) - 1 if match else None
+
+
+def record_video(job_store, item, path):
+    """Records a finished video in job_store, so a resumed run of the job keeps it."""
+    index = video_index(path)
+    if index is not None:
+        job_store.mark_video_done(item, index)
+
+
+def catalogue_video(catalog, item, path, generation_time, profile=None):
+    """Records a finished video in catalog with the prompt and parameters that produced it."""
+    params = {
+        'num_inference_steps': item['num_inference_steps'],
+        'guidance_scale': item['guidance_scale'],
+        'num_frames': item['num_frames'],
+        'negative_prompt': item.get('negative_prompt', ""),
+        'profile': profile,
+    }
+    index = video_index(path)
+    if index is not None:
+        params['seed'] = BASE_SEED + index
+    try:
+        catalog.record(path, prompt=item['text'], params=params, generation_time=generation_time)
+    except Exception as e:
+        logging.warning(f"Failed to catalogue {path}: {e}")  # The video itself is fine
+
+
+def run_engine_process(items, output_dir, device=None, event_queue=None, **engine_kwargs):
+    """Worker-process entry point: renders items on one device and returns (done, failed).
+
+    device pins the process to one CUDA device; it must be set before CUDA is
+    initialised, which holds for freshly spawned workers. Events are put on
+    event_queue (for example a multiprocessing.Manager().Queue()) when given.
+    """
+    if device is not None:
+        os.environ["CUDA_VISIBLE_DEVICES"] = str(device)
+    engine = GenerationEngine(output_dir, **engine_kwargs)
+    return engine.run(items, callback=event_queue.put if event_queue is not None else None)
+
+
+def render_on_devices(items, output_dir, devices, event_queue=None, **engine_kwargs):
+    """Splits items round-robin across one engine process per device and returns (done, failed)."""
+    items = list(items)
+    context = multiprocessing.get_context("spawn")
+    # One shard per process: a reused worker has CUDA initialised already and would ignore the next device pin
+    with context.Pool(len(devices), maxtasksperchild=1) as pool:
+        results = [
+            pool.apply_async(
+                run_engine_process,
+                (items[index::len(devices)], output_dir),
+                dict(engine_kwargs, device=device, event_queue=event_queue),
+            )
+            for index, device in enumerate(devices)
+        ]
+        totals = [result.get() for result in results]
+    return sum(done for done, _ in totals), sum(failed for _, failed in totals)
@@ -0,0 +1,52 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.tracing import NULL_TRACE
+
+
+class ExportPool:
+    """Bounded background stage that encodes finished frame buffers.
+
+    The generator hands each clip's frames to submit() and goes straight on to
+    the next pipeline call. submit() blocks once `depth` clips are in flight,
+    which caps how many decoded frame buffers are held in RAM.
+    """
+
+    def __init__(self, depth=2, workers=1):
+        self.depth = depth
+        self._slots = threading.BoundedSemaphore(depth)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export")
+
+    def submit(self, encoder, frames, output_path, on_done=None, trace=NULL_TRACE):
+        """Queues frames for encoding; on_done(output_path) runs once the file is on disk.
+
+        The time spent waiting for a slot and encoding are recorded on trace.
+        """
+        with trace.span("export_wait"):
+            self._slots.acquire()  # Backpressure: wait for a free slot
+        try:
+            return self._executor.submit(self._export, encoder, frames, output_path, on_done, trace)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _export(self, encoder, frames, output_path, on_done, trace):
+        try:
+            with trace.span("export", path=output_path):
+                encoder.encode(frames, output_path)
+        except Exception as e:
+            logging.error(f"Failed to export {output_path}: {e}")
+            raise
+        finally:
+            self._slots.release()
+        if on_done is not None:
+            on_done(output_path)
+
+    @staticmethod
+    def wait(futures):
+        """Blocks until the given exports are done and re-raises the first failure."""
+        for future in futures:
+            future.result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,54 @@
+import importlib
+import logging
+import os
+import time
+from PyQt6.QtCore import QThread, pyqtSignal
+
+# Imported after the window is shown; the monitor comes first so it can open early
+UI_MODULES = ('ui.resource_monitor',)
+BACKEND_MODULES = ('core.render_worker', 'services.pipeline_service', 'core.ai_interface')
+PROFILE_MODULE = 'services.pipeline_service'
+
+
+def prewarm_enabled():
+    """AUTOPLAY_PREWARM=0 leaves every heavy import to its first use."""
+    return os.getenv("AUTOPLAY_PREWARM", "1") != "0"
+
+
+class Prewarmer(QThread):
+    """Imports the heavy modules (matplotlib, torch, diffusers, openai) in the background.
+
+    The main window imports them lazily, so it can paint before they are
+    loaded; this thread loads them right after it does, so the first render
+    or chart does not stall the GUI. module_loaded(name) fires as each one
+    becomes available; a module that fails to import is logged and skipped,
+    and is imported (and fails) again where it is actually used. Once the
+    backend is loaded the execution profile is selected here as well, since
+    that queries CUDA, and reported through profile_selected(name).
+    """
+    module_loaded = pyqtSignal(str)
+    profile_selected = pyqtSignal(str)
+
+    def __init__(self, modules=UI_MODULES + BACKEND_MODULES):
+        super().__init__()
+        self.modules = modules
+
+    def run(self):
+        for name in self.modules:
+            start = time.time()
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                logging.warning(f"Pre-warming {name} failed: {e}")
+                continue
+            logging.info(f"Pre-warmed {name} in {time.time() - start:.2f}s")
+            self.module_loaded.emit(name)
+            if name == PROFILE_MODULE:
+                self.select_profile()
+
+    def select_profile(self):
+        try:
+            from services.pipeline_service import select_profile
+            self.profile_selected.emit(select_profile())
+        except Exception as e:
+            logging.warning(f"Could not select an execution profile: {e}")
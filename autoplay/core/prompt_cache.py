@@ -0,0 +1,116 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+import torch
+
+MAX_SEQUENCE_LENGTH = 226  # T5 token length used by CogVideoX
+
+
+class PromptEmbeddingCache:
+    """LRU cache of text-encoder outputs keyed by model, dtype and prompt text.
+
+    Positive and negative prompts are cached as separate entries, so queue
+    items that only differ in steps, guidance or frame count skip the T5
+    encoder entirely. Embeddings live on the CPU; with cache_dir set they are
+    also written to disk and survive restarts. The dtype is part of the key,
+    since the same weights loaded under another profile encode in another
+    precision.
+    """
+
+    def __init__(self, max_entries=64, cache_dir=None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, pipe, text, max_sequence_length=MAX_SEQUENCE_LENGTH):
+        """Returns the (1, tokens, dim) CPU embedding of text, encoding it on a miss."""
+        key = (getattr(pipe, 'name_or_path', None), str(getattr(pipe, 'dtype', None)), text, max_sequence_length)
+        with self._lock:
+            embeds = self._entries.get(key)
+            if embeds is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return embeds
+
+        embeds = self._load(key)
+        if embeds is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            with torch.no_grad():
+                embeds, _ = pipe.encode_prompt(
+                    prompt=text,
+                    do_classifier_free_guidance=False,
+                    num_videos_per_prompt=1,
+                    max_sequence_length=max_sequence_length,
+                )
+            embeds = embeds.cpu()
+            self._save(key, embeds)
+
+        with self._lock:
+            self._entries[key] = embeds
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return embeds
+
+    def embeddings_for(self, pipe, prompt, negative_prompt, guidance_scale, batch_size):
+        """Returns pipeline-ready prompt_embeds and negative_prompt_embeds for a batch."""
+        device = pipe._execution_device
+        prompt_embeds = self.get(pipe, prompt).to(device).repeat(batch_size, 1, 1)
+        negative_prompt_embeds = None
+        if guidance_scale > 1:  # Classifier-free guidance needs the negative branch
+            negative_prompt_embeds = self.get(pipe, negative_prompt or "").to(device).repeat(batch_size, 1, 1)
+        return prompt_embeds, negative_prompt_embeds
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _path(self, key):
+        digest = hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.pt")
+
+    def _load(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return torch.load(path, map_location='cpu')
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable prompt cache entry {path}: {e}")
+            return None
+
+    def _save(self, key, embeds):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        temp_path = f"{path}.tmp"
+        try:
+            torch.save(embeds, temp_path)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logging.warning(f"Failed to write prompt cache entry {path}: {e}")
+
+
+_prompt_cache = None
+_prompt_cache_lock = threading.Lock()
+
+
+def get_prompt_cache():
+    """Returns the process-wide prompt cache, using AUTOPLAY_PROMPT_CACHE_DIR as its disk tier."""
+    global _prompt_cache
+    with _prompt_cache_lock:
+        if _prompt_cache is None:
+            _prompt_cache = PromptEmbeddingCache(cache_dir=os.getenv("AUTOPLAY_PROMPT_CACHE_DIR"))
+        return _prompt_cache
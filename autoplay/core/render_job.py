@@ -0,0 +1,294 @@
+import os
+import time
+import logging
+import torch
+from core.cost_model import get_cost_model
+from core.export_pool import ExportPool
+from core.prompt_cache import get_prompt_cache
+from core.video_encoder import FFmpegEncoder
+from utils.tracing import NULL_TRACE, get_tracer
+
+BASE_SEED = 42  # Video i of a job is always generated with seed BASE_SEED + i
+VIDEO_HEIGHT = 480
+VIDEO_WIDTH = 720
+
+
+class RenderJob:
+    """Renders all videos of one queue item with an already loaded pipeline.
+
+    Progress is reported through plain callbacks, so the same job can be run
+    from a one-off QThread or from a long-lived render worker.
+    """
+
+    def __init__(
+        self,
+        text,
+        num_inference_steps,
+        guidance_scale,
+        num_frames,
+        project_name,
+        sequence_number,
+        output_dir,
+        num_videos,
+        encoder=None,
+        batch_size=1,
+        negative_prompt="",
+        prompt_cache=None,
+        profile=None,
+        cost_model=None,
+        tracer=None,
+        trace_profiler=None,
+        finished_videos=(),
+    ):
+        self.text = text
+        self.num_inference_steps = num_inference_steps
+        self.guidance_scale = guidance_scale
+        self.num_frames = num_frames
+        self.project_name = project_name
+        self.sequence_number = sequence_number
+        self.output_dir = output_dir
+        self.num_videos = num_videos
+        self.encoder = encoder or FFmpegEncoder()
+        self.batch_size = max(1, batch_size)  # Videos generated per pipeline call
+        self.negative_prompt = negative_prompt
+        self.prompt_cache = prompt_cache or get_prompt_cache()
+        self.profile = profile  # Execution profile of the pipeline, for reporting and timing history
+        self.cost_model = cost_model or get_cost_model()
+        self.tracer = tracer or get_tracer()
+        self.trace_profiler = trace_profiler  # "cprofile" or "torch" to profile this job while tracing
+        self.finished_videos = set(finished_videos)  # Indices an interrupted run of this job already wrote
+        self.wall_time = None
+
+    @classmethod
+    def from_item(
+        cls,
+        item,
+        output_dir,
+        encoder=None,
+        batch_size=1,
+        profile=None,
+        prompt_cache=None,
+        cost_model=None,
+        tracer=None,
+    ):
+        """Builds a job from a queue item as created by PromptPanel.add_to_queue."""
+        return cls(
+            item['text'],
+            item['num_inference_steps'],
+            item['guidance_scale'],
+            item['num_frames'],
+            item['project_name'],
+            item['sequence_number'],
+            output_dir,
+            item['num_videos'],
+            encoder=encoder,
+            batch_size=item.get('batch_size', batch_size),
+            negative_prompt=item.get('negative_prompt', ""),
+            prompt_cache=prompt_cache,
+            profile=profile,
+            cost_model=cost_model,
+            tracer=tracer,
+            trace_profiler=item.get('trace_profiler'),
+            finished_videos=item.get('finished_videos', ()),
+        )
+
+    def output_path(self, video_idx):
+        return os.path.join(
+            self.output_dir,
+            f"{self.project_name}_{self.sequence_number}_video_{video_idx + 1}.mp4",
+        )
+
+    def is_rendered(self, video_idx):
+        """True if the video's output file already exists and is not empty."""
+        output_path = self.output_path(video_idx)
+        return os.path.exists(output_path) and os.path.getsize(output_path) > 0
+
+    def run(self, pipe, on_progress=None, on_time_estimate=None, on_video_generated=None, export_pool=None):
+        """Generates every video of the job.
+
+        Encoding runs on export_pool (a private one if none is given) while the
+        next video is generated; run() returns once all files are on disk.
+        """
+        trace = self.tracer.job(
+            f"{self.project_name}_{self.sequence_number}",
+            profiler=self.trace_profiler,
+            num_videos=self.num_videos,
+            num_frames=self.num_frames,
+            num_inference_steps=self.num_inference_steps,
+            batch_size=self.batch_size,
+            profile=self.profile,
+        )
+        with trace:
+            self._render(pipe, trace, on_progress, on_time_estimate, on_video_generated, export_pool)
+
+    def _render(self, pipe, trace, on_progress, on_time_estimate, on_video_generated, export_pool):
+        owns_pool = export_pool is None
+        if owns_pool:
+            export_pool = ExportPool()
+
+        pending_exports = []
+        try:
+            start_time = time.time()
+
+            # Only videos the job store recorded for this job are kept; any other file at
+            # these paths is overwritten, since a new session may reuse them for a new prompt
+            remaining = [
+                video_idx for video_idx in range(self.num_videos)
+                if not (video_idx in self.finished_videos and self.is_rendered(video_idx))
+            ]
+            skipped = self.num_videos - len(remaining)
+            if skipped:
+                logging.info(f"Skipping {skipped} existing videos for {self.project_name}_{self.sequence_number}")
+            if not remaining:
+                self._notify(on_progress, 100)
+
+            # Start from the timing history and refine with every denoising step
+            prediction = self.cost_model.predict_video(
+                self.num_frames, self.num_inference_steps, VIDEO_HEIGHT, VIDEO_WIDTH, self.profile
+            )
+            timing = {
+                "step_time": prediction[0] if prediction else None,  # Seconds per step for one video
+                "overhead": prediction[1] if prediction else 0.0,  # Seconds per video outside the loop
+                "video_steps_done": 0,
+                "videos_done": 0,
+            }
+            total_video_steps = len(remaining) * self.num_inference_steps
+
+            def report():
+                done = skipped * self.num_inference_steps + timing["video_steps_done"]
+                self._notify(on_progress, int(done / (self.num_videos * self.num_inference_steps) * 100))
+                if timing["step_time"] is not None:
+                    remaining_time = (
+                        (total_video_steps - timing["video_steps_done"]) * timing["step_time"]
+                        + (len(remaining) - timing["videos_done"]) * timing["overhead"]
+                    )
+                    self._notify(on_time_estimate, f"Estimated time remaining: {remaining_time:.2f} seconds")
+
+            if remaining:
+                report()
+
+            batch_size = self.batch_size
+            rendered = 0
+            while rendered < len(remaining):
+                generation_start_time = time.time()  # Start time for this batch of videos
+                batch_indices = remaining[rendered:rendered + batch_size]
+                count = len(batch_indices)
+                last_step_time = [generation_start_time]
+
+                def on_step(step):
+                    now = time.time()
+                    step_time = (now - last_step_time[0]) / count
+                    last_step_time[0] = now
+                    if timing["step_time"] is None:
+                        timing["step_time"] = step_time
+                    else:
+                        timing["step_time"] += 0.3 * (step_time - timing["step_time"])
+                    timing["video_steps_done"] += count
+                    report()
+
+                steps_before_batch = timing["video_steps_done"]
+                try:
+                    batch_frames = self.generate_batch(pipe, batch_indices, on_step=on_step, trace=trace)
+                except torch.cuda.OutOfMemoryError:
+                    if count == 1:
+                        raise
+                    # Retry the same videos in smaller batches; seeds stay per video
+                    batch_size = count // 2
+                    logging.warning(f"Out of memory with batch size {count}, retrying with {batch_size}")
+                    timing["video_steps_done"] = steps_before_batch
+                    torch.cuda.empty_cache()
+                    continue
+
+                # Hand the frames to the export stage and move on to the next batch
+                for video_idx, video_frames in zip(batch_indices, batch_frames):
+                    pending_exports.append(export_pool.submit(
+                        self.encoder,
+                        video_frames,
+                        self.output_path(video_idx),
+                        self._exported_callback(on_video_generated, generation_start_time),
+                        trace=trace,
+                    ))
+                del batch_frames, video_frames
+                rendered += count
+
+                # Everything after the last step (VAE decode) is per-video overhead
+                batch_time = time.time() - generation_start_time
+                denoise_time = last_step_time[0] - generation_start_time
+                if denoise_time > 0:
+                    overhead = (batch_time - denoise_time) / count
+                    self.cost_model.record(
+                        self.num_frames, self.num_inference_steps, VIDEO_HEIGHT, VIDEO_WIDTH, self.profile,
+                        denoise_time / self.num_inference_steps / count, overhead,
+                    )
+                    timing["overhead"] = overhead
+                timing["video_steps_done"] = steps_before_batch + count * self.num_inference_steps
+                timing["videos_done"] += count
+                report()
+
+            with trace.span("export_drain"):
+                export_pool.wait(pending_exports)
+
+            self.wall_time = time.time() - start_time
+            logging.info(
+                f"Rendered {len(remaining)} videos for {self.project_name}_{self.sequence_number} "
+                f"in {self.wall_time:.2f} seconds (profile: {self.profile}, batch size: {self.batch_size})"
+            )
+        finally:
+            self.cost_model.save()
+            if owns_pool:
+                export_pool.shutdown()
+
+    def generate_batch(self, pipe, video_indices, on_step=None, trace=NULL_TRACE):
+        """Generates several videos in one pipeline call.
+
+        Every sample gets its own generator seeded with BASE_SEED + index, so
+        its initial and scheduler noise match a one-video-per-call run.
+        on_step(step) is called after every denoising step.
+        """
+        last_step_end = [None]
+
+        def step_end(pipe, step, timestep, callback_kwargs):
+            last_step_end[0] = time.perf_counter()
+            if on_step is not None:
+                on_step(step)
+            return callback_kwargs
+
+        generators = [torch.Generator().manual_seed(BASE_SEED + video_idx) for video_idx in video_indices]
+        with trace.span("encode_prompt"):
+            prompt_embeds, negative_prompt_embeds = self.prompt_cache.embeddings_for(
+                pipe, self.text, self.negative_prompt, self.guidance_scale, len(generators)
+            )
+        call_start = time.perf_counter()
+        result = pipe(
+            prompt_embeds=prompt_embeds,
+            negative_prompt_embeds=negative_prompt_embeds,
+            num_videos_per_prompt=1,  # The cached embeddings are already repeated per video
+            num_inference_steps=self.num_inference_steps,
+            num_frames=self.num_frames,
+            height=VIDEO_HEIGHT,
+            width=VIDEO_WIDTH,
+            use_dynamic_cfg=True,
+            guidance_scale=self.guidance_scale,
+            generator=generators if len(generators) > 1 else generators[0],
+            callback_on_step_end=step_end,
+        )
+        call_end = time.perf_counter()
+
+        # The pipeline call is the denoising loop followed by the VAE decode
+        if last_step_end[0] is None:
+            trace.add("pipeline", call_start, call_end, videos=len(generators))
+        else:
+            trace.add("denoise", call_start, last_step_end[0], videos=len(generators))
+            trace.add("decode", last_step_end[0], call_end, videos=len(generators))
+        return result.frames  # One list of frames per video
+
+    def _exported_callback(self, on_video_generated, generation_start_time):
+        def on_done(output_path):
+            generation_time = time.time() - generation_start_time
+            self._notify(on_video_generated, output_path, generation_time)
+        return on_done
+
+    @staticmethod
+    def _notify(callback, *args):
+        if callback is not None:
+            callback(*args)
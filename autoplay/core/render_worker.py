@@ -0,0 +1,79 @@
+import logging
+from PyQt6.QtCore import QThread, pyqtSignal
+from core.engine import GenerationEngine
+
+
+class RenderWorker(QThread):
+    """Long-lived thread that drains the QueueManager with one warm pipeline.
+
+    A thin Qt adapter over GenerationEngine: items added to the queue while
+    the worker is running are picked up back-to-back and engine events are
+    re-emitted as signals. If the pipeline fails to load, error_occurred
+    reports it and the worker exits without retrying.
+    """
+    finished = pyqtSignal()  # Emitted when the worker exits; drained tells whether the queue ran out
+    error_occurred = pyqtSignal(str)
+    progress = pyqtSignal(int)
+    time_estimate = pyqtSignal(str)
+    video_generated = pyqtSignal(str, float)  # Video path and generation time
+    item_started = pyqtSignal(dict)
+    item_finished = pyqtSignal(dict)
+    item_failed = pyqtSignal(dict, str)
+
+    def __init__(
+        self, queue_manager, output_dir, encoder=None, export_depth=2, batch_size=None, profile=None, catalog=None
+    ):
+        super().__init__()
+        self.queue_manager = queue_manager
+        self.output_dir = output_dir
+        self.encoder = encoder
+        self.export_depth = export_depth  # Clips that may wait for encoding at once
+        self.batch_size = batch_size  # Videos per pipeline call, halved on OOM; None uses the profile's
+        self.profile = profile  # Execution profile name, None to auto-select
+        self.catalog = catalog  # Optional Catalog of the output directory
+        self._stop_requested = False
+        self.drained = False  # The queue ran out, rather than a stop or a load failure ending the worker
+
+    def stop(self):
+        """Asks the worker to stop after the item it is currently rendering."""
+        self._stop_requested = True
+
+    def run(self):
+        try:
+            engine = GenerationEngine(
+                self.output_dir,
+                profile=self.profile,
+                batch_size=self.batch_size,
+                encoder=self.encoder,
+                export_depth=self.export_depth,
+                job_store=self.queue_manager.store,
+                catalog=self.catalog,
+            )
+            engine.run(
+                self.queue_manager.get_next_item,
+                callback=self.dispatch,
+                should_stop=lambda: self._stop_requested,
+            )
+        except Exception as e:
+            # Failing items are reported by the engine; this is the pipeline or engine itself
+            logging.error(f"Render worker failed: {e}")
+            self.error_occurred.emit(str(e))
+        else:
+            self.drained = not self._stop_requested
+        self.finished.emit()
+
+    def dispatch(self, event):
+        """Re-emits an engine event as the matching Qt signal."""
+        if event.kind == "job_started":
+            logging.info(f"Starting render for item: {event.item['project_name']}")
+            self.item_started.emit(event.item)
+        elif event.kind == "progress":
+            self.progress.emit(*event.data)
+        elif event.kind == "time_estimate":
+            self.time_estimate.emit(*event.data)
+        elif event.kind == "video_generated":
+            self.video_generated.emit(*event.data)
+        elif event.kind == "job_finished":
+            self.item_finished.emit(event.item)
+        elif event.kind == "job_failed":
+            self.item_failed.emit(event.item, *event.data)
@@ -0,0 +1,102 @@
+import logging
+import os
+import subprocess  # For running FFmpeg commands
+import tempfile
+import numpy as np
+
+
+class FFmpegEncoder:
+    """Encodes RGB frames with a single FFmpeg process fed over stdin.
+
+    Frames are streamed as raw rgb24, so every clip is encoded exactly once
+    and no intermediate file is written. The clip is encoded under a .part
+    name and renamed when complete, so an existing output is always whole.
+    """
+
+    def __init__(
+        self,
+        codec='libx264',
+        crf=None,
+        preset='medium',
+        fps=8,
+        output_fps=24,
+        pix_fmt='yuv420p',
+        ffmpeg_path='ffmpeg',
+    ):
+        self.codec = codec
+        self.crf = crf  # None leaves quality to the codec default
+        self.preset = preset  # None for codecs without presets
+        self.fps = fps  # Rate the generated frames are played back at
+        self.output_fps = output_fps  # Container frame rate, None to keep fps
+        self.pix_fmt = pix_fmt
+        self.ffmpeg_path = ffmpeg_path
+
+    def build_command(self, output_path, width, height):
+        command = [
+            self.ffmpeg_path,
+            '-y',  # Overwrite output files without asking
+            '-loglevel', 'error',
+            '-f', 'rawvideo',
+            '-pix_fmt', 'rgb24',
+            '-s', f'{width}x{height}',
+            '-r', str(self.fps),
+            '-i', '-',  # Read frames from stdin
+            '-c:v', self.codec,
+        ]
+        if self.preset is not None:
+            command += ['-preset', self.preset]
+        if self.crf is not None:
+            command += ['-crf', str(self.crf)]
+        command += ['-pix_fmt', self.pix_fmt]
+        if self.output_fps is not None:
+            command += ['-r', str(self.output_fps)]
+        command.append(output_path)
+        return command
+
+    @staticmethod
+    def to_rgb24(frame):
+        """Converts a PIL image or an HxWx3 array (uint8 or float in [0, 1]) to rgb24."""
+        if hasattr(frame, 'convert'):  # PIL image
+            frame = frame.convert('RGB')
+        frame = np.asarray(frame)
+        if frame.dtype != np.uint8:
+            frame = (np.clip(frame, 0.0, 1.0) * 255).round().astype(np.uint8)
+        return np.ascontiguousarray(frame)
+
+    def encode(self, frames, output_path):
+        """Encodes frames into output_path and returns the number of bytes written."""
+        frames = iter(frames)
+        first_frame = next(frames, None)
+        if first_frame is None:
+            raise ValueError(f"No frames to encode for {output_path}")
+
+        first_frame = self.to_rgb24(first_frame)
+        height, width = first_frame.shape[:2]
+        root, extension = os.path.splitext(output_path)
+        partial_path = f"{root}.part{extension}"  # Keep the extension so FFmpeg picks the container
+        command = self.build_command(partial_path, width, height)
+
+        # stderr goes to a file: a pipe nobody reads while frames are written could fill up and
+        # block FFmpeg, which would then stop reading stdin and block this thread as well
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=stderr_file)
+            try:
+                process.stdin.write(first_frame.tobytes())
+                for frame in frames:
+                    process.stdin.write(self.to_rgb24(frame).tobytes())
+            except BrokenPipeError:
+                pass  # FFmpeg exited early; the return code below reports why
+            finally:
+                process.stdin.close()
+            return_code = process.wait()
+            stderr_file.seek(0)
+            stderr = stderr_file.read()
+
+        if return_code != 0:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)  # Do not leave a truncated clip behind
+            logging.error(f"FFmpeg failed for {output_path}: {stderr.decode(errors='replace').strip()}")
+            raise subprocess.CalledProcessError(return_code, command, stderr=stderr)
+
+        os.replace(partial_path, output_path)
+        return os.path.getsize(output_path)
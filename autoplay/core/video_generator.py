@@ -1,23 +1,9 @@
-import os
-import torch
-import time
-import gc
-from PyQt6.QtCore import QThread, pyqtSignal
-from diffusers import CogVideoXPipeline, CogVideoXDPMScheduler
-from diffusers.utils import export_to_video
 import logging
-
-import os
-import torch
-import time
-import gc
-import subprocess  # For running FFmpeg commands
 from PyQt6.QtCore import QThread, pyqtSignal
-from diffusers import CogVideoXPipeline, CogVideoXDPMScheduler
-from diffusers.utils import export_to_video
-import logging
+from core.engine import GenerationEngine
 
 class VideoGenerator(QThread):
+    """Qt adapter that renders a single queue item with GenerationEngine."""
     finished = pyqtSignal()
     progress = pyqtSignal(int)
     time_estimate = pyqtSignal(str)
@@ -33,98 +19,37 @@ class VideoGenerator(QThread):
         sequence_number,
         output_dir,
         num_videos,
+        profile=None,
     ):
         super().__init__()
-        self.text = text
-        self.num_inference_steps = num_inference_steps
-        self.guidance_scale = guidance_scale
-        self.num_frames = num_frames
-        self.project_name = project_name
-        self.sequence_number = sequence_number
+        self.item = {
+            "project_name": project_name,
+            "text": text,
+            "num_inference_steps": num_inference_steps,
+            "guidance_scale": guidance_scale,
+            "num_frames": num_frames,
+            "sequence_number": sequence_number,
+            "num_videos": num_videos,
+        }
         self.output_dir = output_dir
-        self.num_videos = num_videos
-        self.generation_start_time = None
+        self.profile = profile
 
     def run(self):
+        engine = None
         try:
-            # Initialize the pipeline with bfloat16 precision
-            pipe = CogVideoXPipeline.from_pretrained("THUDM/CogVideoX-5b", torch_dtype=torch.bfloat16)
-
-            # Configure the scheduler
-            pipe.scheduler = CogVideoXDPMScheduler.from_config(pipe.scheduler.config, timestep_spacing="trailing")
-
-            # Enable memory optimization techniques
-            pipe.enable_model_cpu_offload()
-            pipe.enable_sequential_cpu_offload()
-            pipe.vae.enable_slicing()
-            pipe.vae.enable_tiling()
-
-            start_time = time.time()
-            for video_idx in range(self.num_videos):
-                self.generation_start_time = time.time()  # Start time for each individual video
-
-                # Generate video frames
-                result = pipe(
-                    prompt=self.text,
-                    num_videos_per_prompt=1,
-                    num_inference_steps=self.num_inference_steps,
-                    num_frames=self.num_frames,
-                    height=480,
-                    width=720,
-                    use_dynamic_cfg=True,
-                    guidance_scale=self.guidance_scale,
-                    generator=torch.Generator().manual_seed(42 + video_idx),
-                )
-                video_frames = result.frames[0]  # Get the video frames
-
-                # Update progress
-                progress = int(((video_idx + 1) / self.num_videos) * 100)
-                self.progress.emit(progress)
-
-                # Calculate and emit time estimate
-                elapsed_time = time.time() - start_time
-                estimated_total_time = elapsed_time / (video_idx + 1) * self.num_videos
-                remaining_time = estimated_total_time - elapsed_time
-                self.time_estimate.emit(f"Estimated time remaining: {remaining_time:.2f} seconds")
-
-                # Save the video frames to a temporary file
-                temp_output_path = os.path.join(
-                    self.output_dir,
-                    f"temp_{self.project_name}_{self.sequence_number}_video_{video_idx + 1}.mp4",
-                )
-                export_to_video(video_frames, temp_output_path, fps=8)
-
-                # Re-encode the video using FFmpeg
-                output_path = os.path.join(
-                    self.output_dir,
-                    f"{self.project_name}_{self.sequence_number}_video_{video_idx + 1}.mp4",
-                )
-                ffmpeg_command = [
-                    'ffmpeg',
-                    '-y',  # Overwrite output files without asking
-                    '-i', temp_output_path,
-                    '-c:v', 'libx264',  # Video codec: H.264
-                    '-pix_fmt', 'yuv420p',  # Pixel format
-                    '-r', '24',  # Frame rate
-                    output_path,
-                ]
-                # Run the FFmpeg command
-                subprocess.run(ffmpeg_command, check=True)
-
-                # Remove the temporary file
-                os.remove(temp_output_path)
-
-                generation_time = time.time() - self.generation_start_time
-                self.video_generated.emit(output_path, generation_time)
-
-                # Clear memory after each video generation
-                torch.cuda.empty_cache()
-                gc.collect()
-
+            engine = GenerationEngine(self.output_dir, profile=self.profile)
+            engine.render(self.item, callback=self.dispatch)
             self.finished.emit()
-
         except Exception as e:
             logging.error(f"Error generating video: {e}")
         finally:
-            torch.cuda.empty_cache()
-            gc.collect()
+            if engine is not None:
+                engine.close()
+
+    def dispatch(self, event):
+        if event.kind == "progress":
+            self.progress.emit(*event.data)
+        elif event.kind == "time_estimate":
+            self.time_estimate.emit(*event.data)
+        elif event.kind == "video_generated":
+            self.video_generated.emit(*event.data)
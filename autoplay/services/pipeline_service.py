@@ -1,15 +1,222 @@
+import gc
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import psutil
 import torch
 from diffusers import CogVideoXPipeline, CogVideoXDPMScheduler
 
-def load_pipeline():
-    pipe = CogVideoXPipeline.from_pretrained("THUDM/CogVideoX-5b", torch_dtype=torch.bfloat16)
-    pipe.scheduler = CogVideoXDPMScheduler.from_config(pipe.scheduler.config, timestep_spacing="trailing")
-    pipe.enable_model_cpu_offload()
-    pipe.enable_sequential_cpu_offload()
-    pipe.vae.enable_slicing()
-    pipe.vae.enable_tiling()
-    
-    if torch.cuda.is_available():
+DEFAULT_MODEL_ID = "THUDM/CogVideoX-5b"
+DEFAULT_DTYPE = torch.bfloat16
+DEFAULT_SCHEDULER = "dpm"
+
+SCHEDULERS = {
+    "dpm": CogVideoXDPMScheduler,
+}
+
+# Execution profiles trade memory for speed. "offload" is None (everything
+# stays on the GPU), "model" (whole components are swapped in as they run)
+# or "sequential" (weights are streamed layer by layer, slowest but smallest).
+# min_memory_gb is the GPU memory a profile needs to be picked automatically.
+PROFILES = {
+    "max-throughput": {
+        "offload": None,
+        "vae_slicing": False,
+        "vae_tiling": False,
+        "batch_size": 2,
+        "min_memory_gb": 40,
+    },
+    "balanced": {
+        "offload": "model",
+        "vae_slicing": True,
+        "vae_tiling": True,
+        "batch_size": 1,
+        "min_memory_gb": 20,
+    },
+    "low-memory": {
+        "offload": "sequential",
+        "vae_slicing": True,
+        "vae_tiling": True,
+        "batch_size": 1,
+        "min_memory_gb": 0,
+    },
+}
+
+
+def detect_gpu_memory_gb():
+    """Returns the total memory of the first CUDA device in GB, or 0 without CUDA."""
+    if not torch.cuda.is_available():
+        return 0.0
+    return torch.cuda.get_device_properties(0).total_memory / 1024 ** 3
+
+
+def select_profile(name=None):
+    """Resolves a profile name, auto-selecting from device memory when none is given.
+
+    AUTOPLAY_PROFILE overrides the automatic choice.
+    """
+    name = name or os.getenv("AUTOPLAY_PROFILE")
+    if name:
+        if name not in PROFILES:
+            raise ValueError(f"Unknown execution profile '{name}', expected one of {', '.join(PROFILES)}")
+        return name
+
+    memory_gb = detect_gpu_memory_gb()
+    # Pick the fastest profile the device can hold
+    for profile_name, profile in sorted(PROFILES.items(), key=lambda entry: -entry[1]["min_memory_gb"]):
+        if memory_gb >= profile["min_memory_gb"]:
+            logging.info(f"Selected execution profile '{profile_name}' for {memory_gb:.1f} GB of GPU memory")
+            return profile_name
+    return "low-memory"
+
+
+def apply_profile(pipe, profile_name):
+    profile = PROFILES[profile_name]
+    offload = profile["offload"]
+
+    if not torch.cuda.is_available():
+        logging.warning(f"CUDA is not available, running profile '{profile_name}' on the CPU without offload")
+    elif offload == "sequential":
+        pipe.enable_sequential_cpu_offload()
+    elif offload == "model":
+        pipe.enable_model_cpu_offload()
+    else:
         pipe.to('cuda')
-    
+
+    if profile["vae_slicing"]:
+        pipe.vae.enable_slicing()
+    if profile["vae_tiling"]:
+        pipe.vae.enable_tiling()
+
+
+def load_pipeline(model_id=DEFAULT_MODEL_ID, torch_dtype=DEFAULT_DTYPE, scheduler=DEFAULT_SCHEDULER, profile="low-memory"):
+    pipe = CogVideoXPipeline.from_pretrained(model_id, torch_dtype=torch_dtype)
+    pipe.scheduler = SCHEDULERS[scheduler].from_config(pipe.scheduler.config, timestep_spacing="trailing")
+
+    # CPU offload already places each module on the GPU when it runs, so an
+    # offloaded pipeline must not be moved to CUDA as a whole afterwards.
+    apply_profile(pipe, profile)
+
     return pipe
+
+
+class PipelineRegistry:
+    """Process-wide cache of loaded pipelines.
+
+    Each (model, dtype, scheduler, profile) combination is loaded once and handed to
+    every caller that asks for it. Least recently used pipelines are evicted
+    when the registry is full or when host/GPU memory runs low.
+    """
+
+    def __init__(self, loader=load_pipeline, max_pipelines=1, min_free_memory=0.10):
+        self.loader = loader
+        self.max_pipelines = max_pipelines
+        self.min_free_memory = min_free_memory  # Fraction of host/GPU memory to keep free
+        self._pipelines = OrderedDict()
+        self._lock = threading.RLock()
+        self._stats = {
+            "loads": 0,
+            "hits": 0,
+            "evictions": 0,
+            "load_time": 0.0,
+        }
+
+    @staticmethod
+    def make_key(model_id, torch_dtype, scheduler, profile):
+        return (model_id, str(torch_dtype), scheduler, profile)
+
+    def get(self, model_id=DEFAULT_MODEL_ID, torch_dtype=DEFAULT_DTYPE, scheduler=DEFAULT_SCHEDULER, profile=None):
+        """Returns a warm pipeline, loading it on first use."""
+        profile = select_profile(profile)
+        key = self.make_key(model_id, torch_dtype, scheduler, profile)
+        with self._lock:
+            pipe = self._pipelines.get(key)
+            if pipe is not None:
+                self._pipelines.move_to_end(key)
+                self._stats["hits"] += 1
+                logging.info(f"Reusing warm pipeline {key} (hit {self._stats['hits']})")
+                return pipe
+
+            self._make_room()
+
+            logging.info(f"Loading pipeline {key}")
+            start_time = time.time()
+            pipe = self.loader(model_id=model_id, torch_dtype=torch_dtype, scheduler=scheduler, profile=profile)
+            load_time = time.time() - start_time
+
+            self._pipelines[key] = pipe
+            self._stats["loads"] += 1
+            self._stats["load_time"] += load_time
+            logging.info(f"Loaded pipeline {key} in {load_time:.2f} seconds")
+            return pipe
+
+    def evict(self, key=None):
+        """Drops one pipeline (the least recently used one by default)."""
+        with self._lock:
+            if not self._pipelines:
+                return
+            if key is None:
+                key = next(iter(self._pipelines))
+            if self._pipelines.pop(key, None) is None:
+                return
+            self._stats["evictions"] += 1
+            logging.info(f"Evicted pipeline {key}")
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def clear(self):
+        with self._lock:
+            while self._pipelines:
+                self.evict()
+
+    def stats(self):
+        """Returns load/reuse statistics and the currently cached keys."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cached"] = list(self._pipelines)
+            requests = stats["loads"] + stats["hits"]
+            stats["hit_rate"] = stats["hits"] / requests if requests else 0.0
+            return stats
+
+    def log_stats(self):
+        stats = self.stats()
+        logging.info(
+            f"Pipeline registry: {stats['loads']} loads ({stats['load_time']:.2f}s), "
+            f"{stats['hits']} reuses, {stats['evictions']} evictions, "
+            f"hit rate {stats['hit_rate']:.0%}"
+        )
+
+    def _make_room(self):
+        while self._pipelines and (len(self._pipelines) >= self.max_pipelines or self._under_memory_pressure()):
+            self.evict()
+
+    def _under_memory_pressure(self):
+        memory = psutil.virtual_memory()
+        if memory.available / memory.total < self.min_free_memory:
+            return True
+        if torch.cuda.is_available():
+            free, total = torch.cuda.mem_get_info()
+            if free / total < self.min_free_memory:
+                return True
+        return False
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Returns the process-wide pipeline registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = PipelineRegistry()
+        return _registry
+
+
+def get_pipeline(model_id=DEFAULT_MODEL_ID, torch_dtype=DEFAULT_DTYPE, scheduler=DEFAULT_SCHEDULER, profile=None):
+    return get_registry().get(model_id=model_id, torch_dtype=torch_dtype, scheduler=scheduler, profile=profile)
@@ -9,17 +9,15 @@ from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QTableWidget, Q
                              QSpinBox, QDoubleSpinBox, QComboBox, QCheckBox)
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QUrl
 from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
-from stable_audio_tools import get_pretrained_model
-from stable_audio_tools.inference.generation import generate_diffusion_cond
-from diffusers import StableAudioPipeline
 from queue import Queue
+from audio import generator_device, get_audio_pipeline
 
 class AudioGeneratorThread(QThread):
     progress_update = pyqtSignal(int, int)
     generation_complete = pyqtSignal(str)
     error_occurred = pyqtSignal(str)
 
-    def __init__(self, prompt, negative_prompt, duration, num_inference_steps, audio_end_in_s, num_waveforms_per_prompt, output_file, use_random_seed, seed):
+    def __init__(self, pipe, prompt, negative_prompt, duration, num_inference_steps, audio_end_in_s, num_waveforms_per_prompt, output_file, use_random_seed, seed):
         super().__init__()
         self.pipe = pipe
         self.prompt = prompt
@@ -35,7 +33,7 @@ class AudioGeneratorThread(QThread):
     def run(self):
         try:
             # Set random seed
-            generator = torch.Generator("cuda").manual_seed(self.seed)
+            generator = torch.Generator(generator_device(self.pipe.device)).manual_seed(self.seed)
             
             def callback(step, timestep, latents):
                 self.progress_update.emit(step, self.num_inference_steps)
@@ -79,10 +77,8 @@ class AudioGeneratorApp(QWidget):
 
     def initialize_pipeline(self):
         try:
-            # Initialize the StableAudioPipeline
-            pipe = StableAudioPipeline.from_pretrained("stabilityai/stable-audio-open-1.0", torch_dtype=torch.float16)
-            pipe = pipe.to("cuda")
-            return pipe
+            # Shared with audio.py; runs on the GPU if there is one, otherwise on the CPU
+            return get_audio_pipeline()
         except Exception as e:
             QMessageBox.critical(self, "Pipeline Error", f"Failed to load the pipeline: {str(e)}")
             sys.exit(1)
@@ -1,5 +1,7 @@
 import sys
 import os
+import logging
+import threading
 import torch
 import torchaudio
 import soundfile as sf
@@ -9,17 +11,118 @@ from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QTableWidget, Q
                              QSpinBox, QDoubleSpinBox, QComboBox, QCheckBox, QSizePolicy)
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QUrl
 from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
-from stable_audio_tools import get_pretrained_model
-from stable_audio_tools.inference.generation import generate_diffusion_cond
 from diffusers import StableAudioPipeline
 from queue import Queue
 
+AUDIO_MODEL_ID = "stabilityai/stable-audio-open-1.0"
+DEFAULT_BATCH_SIZE = int(os.getenv("AUTOPLAY_AUDIO_BATCH_SIZE", 4))  # Waveforms per pipeline call
+DTYPES = {'float32': torch.float32, 'bfloat16': torch.bfloat16, 'float16': torch.float16}
+
+
+def select_device(device=None):
+    """The CUDA GPU when there is one, otherwise the CPU; AUTOPLAY_AUDIO_DEVICE overrides."""
+    device = device or os.getenv("AUTOPLAY_AUDIO_DEVICE")
+    if device:
+        return device
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def select_dtype(device, dtype=None):
+    """float16 on GPUs; float32 on the CPU unless bfloat16 is asked for (AUTOPLAY_AUDIO_DTYPE)."""
+    dtype = dtype or os.getenv("AUTOPLAY_AUDIO_DTYPE")
+    if dtype:
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown audio dtype '{dtype}', expected one of {', '.join(DTYPES)}")
+        return DTYPES[dtype]
+    # Half precision is slow or unsupported for most CPU kernels
+    return torch.float32 if device == "cpu" else torch.float16
+
+
+def configure_cpu_threads(num_threads=None):
+    """Sets torch's intra-op threads, by default one per physical core (AUTOPLAY_AUDIO_THREADS)."""
+    num_threads = num_threads or int(os.getenv("AUTOPLAY_AUDIO_THREADS", 0))
+    if not num_threads:
+        import psutil
+        num_threads = psutil.cpu_count(logical=False) or os.cpu_count() or 1
+    torch.set_num_threads(num_threads)
+    return num_threads
+
+
+def generator_device(device):
+    # Seeds drawn on the CPU give the same noise on every other device
+    return device if str(device).startswith("cuda") else "cpu"
+
+
+def load_audio_pipeline(model_id=AUDIO_MODEL_ID, device=None, dtype=None, quantize=None):
+    """Loads StableAudio for a device, in its dtype.
+
+    quantize (or AUTOPLAY_AUDIO_QUANTIZE=1) converts the transformer's Linear
+    layers to dynamic int8, which only runs on the CPU and from float32.
+    """
+    device = select_device(device)
+    torch_dtype = select_dtype(device, dtype)
+    if quantize is None:
+        quantize = os.getenv("AUTOPLAY_AUDIO_QUANTIZE") == "1"
+    if quantize and device != "cpu":
+        logging.warning(f"int8 quantisation only runs on the CPU, loading {model_id} unquantised on {device}")
+        quantize = False
+    if quantize and torch_dtype != torch.float32:
+        logging.warning("int8 quantisation starts from float32 weights, loading in float32")
+        torch_dtype = torch.float32
+
+    if device == "cpu":
+        logging.info(f"Running audio generation on {configure_cpu_threads()} CPU threads")
+    pipe = StableAudioPipeline.from_pretrained(model_id, torch_dtype=torch_dtype)
+    pipe = pipe.to(device)
+    if quantize:
+        torch.ao.quantization.quantize_dynamic(pipe.transformer, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    logging.info(f"Loaded {model_id} on {device} ({torch_dtype}{', int8 transformer' if quantize else ''})")
+    return pipe
+
+
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+def get_audio_pipeline(model_id=AUDIO_MODEL_ID, device=None, dtype=None, quantize=None):
+    """Loads the StableAudio pipeline on first use and keeps it for every later batch."""
+    device = select_device(device)
+    key = (model_id, device, dtype or os.getenv("AUTOPLAY_AUDIO_DTYPE"), quantize)
+    with _pipelines_lock:
+        pipe = _pipelines.get(key)
+        if pipe is None:
+            pipe = load_audio_pipeline(model_id, device=device, dtype=dtype, quantize=quantize)
+            _pipelines[key] = pipe
+        return pipe
+
+
+def generate_waveforms(pipe, prompts, seeds, negative_prompt, num_inference_steps, audio_end_in_s, callback=None):
+    """One pipeline call generating a waveform per prompt, each from its own seed."""
+    device = generator_device(pipe.device)
+    return pipe(
+        prompt=prompts,
+        negative_prompt=[negative_prompt] * len(prompts),  # Must be a list when the prompt is
+        num_inference_steps=num_inference_steps,
+        audio_end_in_s=audio_end_in_s,
+        num_waveforms_per_prompt=1,  # One waveform per listed prompt, each with its own generator
+        generator=[torch.Generator(device).manual_seed(seed) for seed in seeds],
+        callback=callback,
+        callback_steps=1
+    ).audios
+
+
 class AudioGeneratorThread(QThread):
+    """Generates num_waveforms_per_prompt waveforms for each prompt.
+
+    Every prompt of a run shares its settings, so the (prompt, waveform)
+    samples are generated batch_size at a time in one pipeline call, each
+    with its own seed. The batch is halved if it does not fit in memory.
+    """
     progress_update = pyqtSignal(int, int, int, int)  # prompt_index, waveform_index, step, total_steps
     generation_complete = pyqtSignal(str, int, int)  # output_file, prompt_index, waveform_index
     all_complete = pyqtSignal()
 
-    def __init__(self, prompts, negative_prompt, duration, num_inference_steps, audio_end_in_s, num_waveforms_per_prompt, use_random_seed, seed, project_name):
+    def __init__(self, prompts, negative_prompt, duration, num_inference_steps, audio_end_in_s, num_waveforms_per_prompt, use_random_seed, seed, project_name, batch_size=DEFAULT_BATCH_SIZE, device=None, dtype=None, quantize=None):
         super().__init__()
         self.prompts = prompts
         self.negative_prompt = negative_prompt
@@ -30,37 +133,65 @@ class AudioGeneratorThread(QThread):
         self.use_random_seed = use_random_seed
         self.seed = seed if seed is not None else random.randint(0, 2**32 - 1)
         self.project_name = project_name
+        self.batch_size = max(1, batch_size)
+        self.device = device  # None picks the GPU if there is one, see select_device()
+        self.dtype = dtype
+        self.quantize = quantize
+
+    def sample_seed(self, waveform_index):
+        # A fixed seed still gives each waveform of a prompt its own (reproducible) seed
+        if self.use_random_seed:
+            return random.randint(0, 2**32 - 1)
+        return (self.seed + waveform_index) % 2**32
 
     def run(self):
-        pipe = StableAudioPipeline.from_pretrained("stabilityai/stable-audio-open-1.0", torch_dtype=torch.float16)
-        pipe = pipe.to("cuda")
-
-        for prompt_index, prompt in enumerate(self.prompts):
-            for waveform_index in range(self.num_waveforms_per_prompt):
-                generator = torch.Generator("cuda").manual_seed(self.seed if not self.use_random_seed else random.randint(0, 2**32 - 1))
-
-                def callback(step, timestep, latents):
-                    self.progress_update.emit(prompt_index, waveform_index, step, self.num_inference_steps)
-
-                audio_output = pipe(
-                    prompt=prompt,
-                    negative_prompt=self.negative_prompt,
-                    num_inference_steps=self.num_inference_steps,
-                    audio_end_in_s=self.audio_end_in_s,
-                    num_waveforms_per_prompt=1,  # Generate one waveform at a time
-                    generator=generator,
-                    callback=callback,
-                    callback_steps=1
-                ).audios
-
-                audio = audio_output[0]
+        pipe = get_audio_pipeline(device=self.device, dtype=self.dtype, quantize=self.quantize)
+        samples = [
+            (prompt_index, waveform_index, prompt, self.sample_seed(waveform_index))
+            for prompt_index, prompt in enumerate(self.prompts)
+            for waveform_index in range(self.num_waveforms_per_prompt)
+        ]
+
+        batch_size = self.batch_size
+        done = 0
+        while done < len(samples):
+            batch = samples[done:done + batch_size]
+            try:
+                audios = self.generate_batch(pipe, batch)
+            except torch.cuda.OutOfMemoryError:
+                if len(batch) == 1:
+                    raise
+                # Retry the same samples in smaller batches; seeds stay per sample
+                batch_size = len(batch) // 2
+                logging.warning(f"Out of memory with {len(batch)} waveforms per call, retrying with {batch_size}")
+                torch.cuda.empty_cache()
+                continue
+
+            for (prompt_index, waveform_index, _, _), audio in zip(batch, audios):
                 output = audio.T.float().cpu().numpy()
                 output_file = f"{self.project_name}_{prompt_index+1}_{waveform_index+1}.wav"
                 sf.write(output_file, output, pipe.vae.sampling_rate)
                 self.generation_complete.emit(output_file, prompt_index, waveform_index)
+            done += len(batch)
 
         self.all_complete.emit()
 
+    def generate_batch(self, pipe, batch):
+        """One pipeline call for a list of (prompt_index, waveform_index, prompt, seed) samples."""
+        def callback(step, timestep, latents):
+            for prompt_index, waveform_index, _, _ in batch:
+                self.progress_update.emit(prompt_index, waveform_index, step, self.num_inference_steps)
+
+        return generate_waveforms(
+            pipe,
+            [prompt for _, _, prompt, _ in batch],
+            [seed for _, _, _, seed in batch],
+            self.negative_prompt,
+            self.num_inference_steps,
+            self.audio_end_in_s,
+            callback=callback,
+        )
+
 class AudioPlayerWidget(QWidget):
     def __init__(self, file_path):
         super().__init__()
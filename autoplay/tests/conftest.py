@@ -0,0 +1,26 @@
+import os
+import sys
+import pytest
+
+# Modules import each other from the autoplay directory (e.g. "from core.x import y")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def make_item():
+    """Builds queue items shaped like PromptPanel's; keyword arguments override the fields."""
+    def make_item(**overrides):
+        item = {
+            'panel_id': 0,
+            'project_name': "demo",
+            'text': "a lighthouse at dusk",
+            'num_inference_steps': 2,
+            'guidance_scale': 6.0,
+            'num_frames': 2,
+            'sequence_number': 1,
+            'num_videos': 2,
+            'priority': 0,
+        }
+        item.update(overrides)
+        return item
+    return make_item
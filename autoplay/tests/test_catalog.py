@@ -0,0 +1,79 @@
+import os
+import pytest
+import utils.catalog
+from utils.catalog import Catalog
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils.catalog, 'probe_duration', lambda video_path: 6.0)  # Avoids decoding
+    return tmp_path
+
+
+@pytest.fixture
+def catalog(output_dir):
+    catalog = Catalog.for_output_dir(str(output_dir))
+    yield catalog
+    catalog.close()
+
+
+def write_video(output_dir, name, content=b"video"):
+    path = os.path.join(str(output_dir), name)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+
+def test_record_parses_the_output_name(catalog, output_dir):
+    path = write_video(output_dir, "demo_0001_video_2.mp4")
+    catalog.record(path, prompt="A cat", params={'seed': 7}, generation_time=12.5)
+    [record] = catalog.videos()
+    assert record['path'] == path
+    assert (record['project'], record['sequence'], record['video_index']) == ("demo", 1, 1)
+    assert (record['prompt'], record['params'], record['generation_time']) == ("A cat", {'seed': 7}, 12.5)
+    assert record['duration'] == 6.0
+
+
+def test_rerecording_keeps_what_is_not_given(catalog, output_dir):
+    path = write_video(output_dir, "demo_0001_video_1.mp4")
+    catalog.record(path, prompt="A cat", params={'seed': 7}, generation_time=12.5)
+    write_video(output_dir, "demo_0001_video_1.mp4", b"re-encoded video")
+    catalog.record(path)
+    [record] = catalog.videos()
+    assert (record['prompt'], record['params'], record['generation_time']) == ("A cat", {'seed': 7}, 12.5)
+    assert record['size'] == len(b"re-encoded video")
+
+
+def test_scan_indexes_new_files_and_forgets_deleted_ones(catalog, output_dir):
+    kept = write_video(output_dir, "demo_0001_video_1.mp4")
+    deleted = write_video(output_dir, "demo_0001_video_2.mp4")
+    changed, removed = catalog.scan()
+    assert sorted(record['path'] for record in changed) == [kept, deleted]
+    assert removed == []
+
+    os.remove(deleted)
+    changed, removed = catalog.scan()
+    assert changed == []
+    assert removed == [deleted]
+    assert [record['path'] for record in catalog.videos()] == [kept]
+
+
+def test_scan_skips_unchanged_files(catalog, output_dir):
+    write_video(output_dir, "demo_0001_video_1.mp4")
+    catalog.scan()
+    assert catalog.scan() == ([], [])
+
+
+def test_scan_ignores_partial_and_hidden_files(catalog, output_dir):
+    write_video(output_dir, "demo_0001_video_1.part.mp4")
+    write_video(output_dir, ".hidden.mp4")
+    write_video(output_dir, "notes.txt")
+    assert catalog.scan() == ([], [])
+
+
+def test_files_with_other_names_are_indexed_without_a_project(catalog, output_dir):
+    path = write_video(output_dir, "imported.mp4")
+    [record], _ = catalog.scan()
+    assert record['path'] == path
+    assert record['project'] is None
+    assert record['params'] == {}
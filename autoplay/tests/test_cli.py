@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("diffusers")
+
+import utils.catalog
+from cli import ProgressReporter
+from core.engine import EngineEvent
+from utils.catalog import Catalog
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils.catalog, 'probe_duration', lambda video_path: 6.0)  # Avoids decoding
+    catalog = Catalog.for_output_dir(str(tmp_path))
+    yield catalog
+    catalog.close()
+
+
+def video_generated(tmp_path, item, profile):
+    path = tmp_path / f"{item['project_name']}_{item['sequence_number']}_video_2.mp4"
+    path.write_bytes(b"video")
+    return EngineEvent("video_generated", item, (str(path), 12.5), profile=profile)
+
+
+def test_device_workers_catalogue_videos_with_their_own_profile(tmp_path, catalog, make_item):
+    # With --devices the profile is auto-selected in each worker process, so the reporter has none
+    reporter = ProgressReporter(2, 4, catalog=catalog, profile=None)
+    reporter(video_generated(tmp_path, make_item(sequence_number=1), "max-throughput"))
+    reporter(video_generated(tmp_path, make_item(sequence_number=2), "low-memory"))
+
+    records = catalog.videos()
+    assert [record['params']['profile'] for record in records] == ["max-throughput", "low-memory"]
+    assert [record['params']['seed'] for record in records] == [43, 43]
+
@@ -0,0 +1,56 @@
+import pytest
+from core.cost_model import CostModel
+
+
+def test_no_history_predicts_nothing(make_item):
+    model = CostModel(path=None)
+    item = make_item(num_frames=49, num_inference_steps=50)
+    assert model.predict_video(49, 50, 480, 720, "cuda") is None
+    assert model.predict_item(item, 480, 720, "cuda") is None
+    assert model.predict_queue([item], 480, 720, "cuda") == 0
+
+
+def test_first_sample_is_predicted_exactly():
+    model = CostModel(path=None)
+    model.record(49, 50, 480, 720, "cuda", step_time=2.0, overhead=10.0)
+    assert model.predict_video(49, 50, 480, 720, "cuda") == (2.0, 10.0)
+
+
+def test_later_samples_are_smoothed():
+    model = CostModel(path=None, smoothing=0.5)
+    model.record(49, 50, 480, 720, "cuda", step_time=2.0, overhead=10.0)
+    model.record(49, 50, 480, 720, "cuda", step_time=4.0, overhead=20.0)
+    assert model.predict_video(49, 50, 480, 720, "cuda") == pytest.approx((3.0, 15.0))
+
+
+def test_unseen_frame_count_is_scaled_from_the_same_resolution_and_profile():
+    model = CostModel(path=None)
+    model.record(49, 50, 480, 720, "cuda", step_time=2.0, overhead=10.0)
+    assert model.predict_video(98, 30, 480, 720, "cuda") == pytest.approx((4.0, 20.0))
+    assert model.predict_video(49, 50, 480, 720, "cpu") is None
+    assert model.predict_video(49, 50, 240, 360, "cuda") is None
+
+
+def test_item_and_queue_predictions(make_item):
+    model = CostModel(path=None)
+    model.record(49, 50, 480, 720, "cuda", step_time=2.0, overhead=10.0)
+    item = make_item(num_frames=49, num_inference_steps=50, num_videos=3)
+    single = make_item(num_frames=49, num_inference_steps=50, num_videos=1)
+    assert model.predict_item(item, 480, 720, "cuda") == pytest.approx((50 * 2.0 + 10.0) * 3)
+    assert model.predict_queue([item, single], 480, 720, "cuda") == pytest.approx(330.0 + 110.0)
+    # Items of another profile have no history and are left out of the total
+    assert model.predict_queue([item], 480, 720, "cpu") == 0
+
+
+def test_history_survives_a_reload(tmp_path):
+    path = str(tmp_path / "timings.json")
+    model = CostModel(path)
+    model.record(49, 50, 480, 720, "cuda", step_time=2.0, overhead=10.0)
+    model.save()
+    assert CostModel(path).predict_video(49, 50, 480, 720, "cuda") == (2.0, 10.0)
+
+
+def test_unreadable_history_is_ignored(tmp_path):
+    path = tmp_path / "timings.json"
+    path.write_text("not json", encoding='utf-8')
+    assert CostModel(str(path)).predict_video(49, 50, 480, 720, "cuda") is None
@@ -0,0 +1,138 @@
+import json
+import sqlite3
+import pytest
+from utils.job_store import JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "queue.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_add_assigns_job_id(store, make_item):
+    item = make_item()
+    job_id = store.add(item)
+    assert item['job_id'] == job_id
+    assert store.counts() == {'pending': 1}
+
+
+def test_unfinished_items_come_back_in_queue_order(store, make_item):
+    first, second = make_item(sequence_number=1), make_item(sequence_number=2)
+    store.add(first)
+    store.add(second)
+
+    items = store.unfinished_items()
+    assert [item['sequence_number'] for item in items] == [1, 2]
+    assert [item['job_id'] for item in items] == [first['job_id'], second['job_id']]
+
+
+def test_job_that_never_started_has_no_finished_videos(store, make_item):
+    item = make_item()
+    store.add(item)
+    assert 'finished_videos' not in item
+    assert store.unfinished_items()[0]['finished_videos'] == []
+
+
+def test_finished_videos_are_handed_back_with_the_interrupted_job(store, make_item):
+    interrupted, other = make_item(sequence_number=1, num_videos=3), make_item(sequence_number=2)
+    store.add(interrupted)
+    store.add(other)
+    store.mark_running(interrupted)
+    store.mark_video_done(interrupted, 2)
+    store.mark_video_done(interrupted, 0)
+    store.mark_video_done(interrupted, 2)
+
+    items = store.unfinished_items()
+    assert [item['finished_videos'] for item in items] == [[0, 2], []]
+
+
+def test_finished_failed_and_cancelled_jobs_are_not_resumed(store, make_item):
+    done, failed, cancelled, pending = (make_item(sequence_number=n) for n in range(1, 5))
+    for item in (done, failed, cancelled, pending):
+        store.add(item)
+    store.mark_done(done)
+    store.mark_failed(failed, "boom")
+    store.mark_cancelled(cancelled)
+
+    assert [item['job_id'] for item in store.unfinished_items()] == [pending['job_id']]
+    assert store.counts() == {'done': 1, 'failed': 1, 'cancelled': 1, 'pending': 1}
+
+
+def test_interrupted_running_job_starts_over_as_pending(tmp_path, make_item):
+    path = str(tmp_path / "queue.sqlite3")
+    store = JobStore(path)
+    item = make_item()
+    store.add(item)
+    store.mark_running(item)
+    store.close()  # The process dies while rendering
+
+    reopened = JobStore(path)
+    try:
+        items = reopened.unfinished_items()
+        assert [resumed['job_id'] for resumed in items] == [item['job_id']]
+        assert reopened.counts() == {'pending': 1}
+    finally:
+        reopened.close()
+
+
+def test_items_without_job_id_are_ignored(store, make_item):
+    store.mark_done(make_item())  # Queued before a store was attached
+    store.mark_video_done(make_item(), 0)
+    assert store.counts() == {}
+
+
+def test_store_without_finished_videos_column_is_upgraded(tmp_path, make_item):
+    path = str(tmp_path / "queue.sqlite3")
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute(
+            "CREATE TABLE jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, item TEXT NOT NULL, state TEXT NOT NULL, "
+            "error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        connection.execute(
+            "INSERT INTO jobs (item, state, created_at, updated_at) VALUES (?, 'running', 0, 0)",
+            (json.dumps(make_item()),),
+        )
+    connection.close()
+
+    store = JobStore(path)
+    try:
+        [item] = store.unfinished_items()
+        assert item['finished_videos'] == []
+        store.mark_video_done(item, 1)
+        assert store.unfinished_items()[0]['finished_videos'] == [1]
+    finally:
+        store.close()
+
+
+def test_clear_queue_cancels_stored_jobs(store, make_item):
+    pytest.importorskip("PyQt6")
+    from utils.queue_manager import QueueManager
+
+    manager = QueueManager()
+    manager.attach_store(store)
+    manager.add_to_queue(make_item(sequence_number=1))
+    manager.add_to_queue(make_item(sequence_number=2))
+    manager.clear_queue()
+
+    assert not manager.has_items()
+    assert store.unfinished_items() == []
+    assert store.counts() == {'cancelled': 2}
+
+
+def test_store_cannot_be_switched_while_jobs_are_queued(store, tmp_path, make_item):
+    pytest.importorskip("PyQt6")
+    from utils.queue_manager import QueueManager
+
+    manager = QueueManager()
+    manager.attach_store(store)
+    manager.add_to_queue(make_item())
+    other = JobStore(str(tmp_path / "other.sqlite3"))
+    try:
+        with pytest.raises(RuntimeError):
+            manager.attach_store(other)
+        assert manager.store is store
+    finally:
+        other.close()
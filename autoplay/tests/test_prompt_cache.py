@@ -0,0 +1,42 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from core.prompt_cache import PromptEmbeddingCache
+
+
+class EncodingPipeline:
+    """Counts encode_prompt calls and returns embeddings in its own dtype."""
+
+    name_or_path = "THUDM/CogVideoX-5b"
+    _execution_device = torch.device("cpu")
+
+    def __init__(self, dtype):
+        self.dtype = dtype
+        self.encoded = []
+
+    def encode_prompt(self, prompt, do_classifier_free_guidance, num_videos_per_prompt, max_sequence_length):
+        self.encoded.append(prompt)
+        return torch.ones(1, 4, 8, dtype=self.dtype), None
+
+
+def test_repeated_prompt_is_encoded_once():
+    cache = PromptEmbeddingCache()
+    pipe = EncodingPipeline(torch.bfloat16)
+    cache.get(pipe, "a lighthouse at dusk")
+    cache.get(pipe, "a lighthouse at dusk")
+    assert pipe.encoded == ["a lighthouse at dusk"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_same_weights_in_another_dtype_are_encoded_again(tmp_path):
+    cache = PromptEmbeddingCache(cache_dir=str(tmp_path))
+    bfloat16_pipe, float16_pipe = EncodingPipeline(torch.bfloat16), EncodingPipeline(torch.float16)
+
+    assert cache.get(bfloat16_pipe, "a lighthouse at dusk").dtype == torch.bfloat16
+    prompt_embeds, _ = cache.embeddings_for(float16_pipe, "a lighthouse at dusk", "", 1.0, 2)
+
+    assert prompt_embeds.dtype == torch.float16
+    assert prompt_embeds.shape == (2, 4, 8)
+    assert float16_pipe.encoded == ["a lighthouse at dusk"]
+    assert cache.disk_hits == 0
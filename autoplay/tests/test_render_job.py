@@ -0,0 +1,84 @@
+import os
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("numpy")
+
+from benchmarks.stub_pipeline import StubPipeline
+from core.cost_model import CostModel
+from core.prompt_cache import PromptEmbeddingCache
+from core.render_job import RenderJob
+from utils.tracing import Tracer
+
+
+class RecordingEncoder:
+    """Writes a placeholder file instead of running FFmpeg and remembers what it wrote."""
+
+    def __init__(self):
+        self.paths = []
+
+    def encode(self, frames, output_path):
+        self.paths.append(output_path)
+        with open(output_path, 'wb') as f:
+            f.write(b"new")
+        return 3
+
+
+def render(item, output_dir):
+    encoder = RecordingEncoder()
+    job = RenderJob.from_item(
+        item,
+        str(output_dir),
+        encoder=encoder,
+        prompt_cache=PromptEmbeddingCache(),
+        cost_model=CostModel(path=None),
+        tracer=Tracer(),
+    )
+    progress = []
+    job.run(StubPipeline(step_delay=0, decode_delay=0, encode_delay=0, height=8, width=8), on_progress=progress.append)
+    return job, encoder, progress
+
+
+def write_old_video(job, video_idx):
+    with open(job.output_path(video_idx), 'wb') as f:
+        f.write(b"old")
+
+
+def test_rerendering_an_existing_project_name_does_not_skip_videos(tmp_path, make_item):
+    # A new session numbers its panels from the start again, so the paths of an older render are reused
+    job, _, _ = render(make_item(), tmp_path)
+    for video_idx in range(2):
+        write_old_video(job, video_idx)
+
+    job, encoder, progress = render(make_item(text="a different prompt"), tmp_path)
+
+    assert sorted(encoder.paths) == sorted(job.output_path(video_idx) for video_idx in range(2))
+    for video_idx in range(2):
+        with open(job.output_path(video_idx), 'rb') as f:
+            assert f.read() == b"new"
+    assert progress[-1] == 100
+
+
+def test_resumed_job_keeps_only_the_videos_it_finished_before_the_interruption(tmp_path, make_item):
+    job, _, _ = render(make_item(num_videos=3), tmp_path)
+    os.remove(job.output_path(1))
+    for video_idx in (0, 2):
+        write_old_video(job, video_idx)
+
+    # Video 2 is on disk, but the job store only recorded video 0 for this job
+    job, encoder, progress = render(make_item(num_videos=3, finished_videos=[0]), tmp_path)
+
+    assert sorted(encoder.paths) == [job.output_path(1), job.output_path(2)]
+    with open(job.output_path(0), 'rb') as f:
+        assert f.read() == b"old"
+    assert progress[-1] == 100
+
+
+def test_pending_job_that_never_started_overwrites_files_at_its_paths(tmp_path, make_item):
+    job, _, _ = render(make_item(), tmp_path)
+    for video_idx in range(2):
+        write_old_video(job, video_idx)
+
+    job, encoder, _ = render(make_item(finished_videos=[]), tmp_path)
+
+    assert sorted(encoder.paths) == sorted(job.output_path(video_idx) for video_idx in range(2))
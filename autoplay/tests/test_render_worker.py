@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("PyQt6")
+pytest.importorskip("torch")
+pytest.importorskip("diffusers")
+
+import core.render_worker
+from core.render_worker import RenderWorker
+from utils.queue_manager import QueueManager
+
+
+class FailingEngine:
+    def __init__(self, output_dir, **kwargs):
+        raise RuntimeError("CUDA out of memory")
+
+
+class StoppingEngine:
+    """Finishes at once, as the engine does once should_stop() is true."""
+
+    def __init__(self, output_dir, **kwargs):
+        pass
+
+    def run(self, items, callback=None, should_stop=None):
+        return 0, 0
+
+
+def run_worker(monkeypatch, engine, stop=False):
+    monkeypatch.setattr(core.render_worker, 'GenerationEngine', engine)
+    worker = RenderWorker(QueueManager(), "out")
+    errors, finished = [], []
+    worker.error_occurred.connect(errors.append)
+    worker.finished.connect(lambda: finished.append(True))
+    if stop:
+        worker.stop()
+    worker.run()  # On this thread, so the signals are delivered directly
+    return worker, errors, finished
+
+
+def test_drained_queue_lets_the_window_restart_the_worker(monkeypatch):
+    worker, errors, finished = run_worker(monkeypatch, StoppingEngine)
+    assert worker.drained
+    assert errors == []
+    assert finished == [True]
+
+
+def test_load_failure_is_reported_and_not_retried(monkeypatch):
+    worker, errors, finished = run_worker(monkeypatch, FailingEngine)
+    assert not worker.drained
+    assert errors == ["CUDA out of memory"]
+    assert finished == [True]
+
+
+def test_stopped_worker_is_not_restarted(monkeypatch):
+    worker, errors, finished = run_worker(monkeypatch, StoppingEngine, stop=True)
+    assert not worker.drained
+    assert errors == []
+    assert finished == [True]
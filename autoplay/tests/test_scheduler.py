@@ -0,0 +1,80 @@
+import pytest
+from utils.scheduler import FAIR, FIFO, SHORTEST_FIRST, JobScheduler, estimated_cost
+
+
+def drain(scheduler):
+    names = []
+    while len(scheduler):
+        names.append(scheduler.pop()['name'])
+    return names
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        JobScheduler("random")
+
+
+def test_pop_on_empty_queue_returns_none():
+    assert JobScheduler(FIFO).pop() is None
+
+
+def test_fifo_keeps_queue_order(make_item):
+    scheduler = JobScheduler(FIFO)
+    for name in "abc":
+        scheduler.push(make_item(name=name, panel_id=ord(name)))
+    assert drain(scheduler) == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize("policy", [FAIR, FIFO, SHORTEST_FIRST])
+def test_higher_priority_goes_first_under_every_policy(policy, make_item):
+    scheduler = JobScheduler(policy)
+    scheduler.push(make_item(name="low", num_frames=9))
+    scheduler.push(make_item(name="high", priority=5, num_frames=97))
+    scheduler.push(make_item(name="medium", priority=1))
+    assert drain(scheduler) == ["high", "medium", "low"]
+
+
+def test_shortest_first_orders_by_estimated_cost_then_queue_order(make_item):
+    scheduler = JobScheduler(SHORTEST_FIRST)
+    scheduler.push(make_item(name="long", num_frames=97))
+    scheduler.push(make_item(name="short", num_frames=9))
+    scheduler.push(make_item(name="short-too", num_frames=9))
+    scheduler.push(make_item(name="many", num_frames=9, num_videos=40))
+    assert drain(scheduler) == ["short", "short-too", "long", "many"]
+
+
+def test_estimated_cost_is_frames_times_steps_times_videos(make_item):
+    assert estimated_cost(make_item(num_frames=49, num_inference_steps=50, num_videos=2)) == 4900
+
+
+def test_fair_alternates_between_panels(make_item):
+    scheduler = JobScheduler(FAIR)
+    for name in ("a1", "a2", "a3"):
+        scheduler.push(make_item(name=name, panel_id=1))
+    for name in ("b1", "b2"):
+        scheduler.push(make_item(name=name, panel_id=2))
+    assert drain(scheduler) == ["a1", "b1", "a2", "b2", "a3"]
+
+
+def test_fair_treats_projects_of_one_panel_as_separate_owners(make_item):
+    scheduler = JobScheduler(FAIR)
+    scheduler.push(make_item(name="x1", project_name="x"))
+    scheduler.push(make_item(name="x2", project_name="x"))
+    scheduler.push(make_item(name="y1", project_name="y"))
+    assert drain(scheduler) == ["x1", "y1", "x2"]
+
+
+@pytest.mark.parametrize("policy", [FAIR, FIFO, SHORTEST_FIRST])
+def test_items_lists_the_queue_in_push_order(policy, make_item):
+    scheduler = JobScheduler(policy)
+    for index, name in enumerate(["c", "a", "b"]):
+        scheduler.push(make_item(name=name, panel_id=index % 2, num_frames=97 - index * 40))
+    assert [item['name'] for item in scheduler.items()] == ["c", "a", "b"]
+
+
+def test_clear_empties_the_queue(make_item):
+    scheduler = JobScheduler(FAIR)
+    scheduler.push(make_item(name="a"))
+    scheduler.clear()
+    assert len(scheduler) == 0
+    assert scheduler.pop() is None
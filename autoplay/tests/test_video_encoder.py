@@ -0,0 +1,50 @@
+import os
+import stat
+import subprocess
+import sys
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.video_encoder import FFmpegEncoder
+
+# Stands in for FFmpeg: logs an error line per frame before reading it, then writes the output
+FAKE_FFMPEG = """#!{python}
+import sys
+frame_size = {frame_size}
+while True:
+    sys.stderr.write("error while encoding frame\\n" * 2000)
+    sys.stderr.flush()
+    if not sys.stdin.buffer.read(frame_size):
+        break
+with open(sys.argv[-1], "wb") as f:
+    f.write(b"video")
+sys.exit({exit_code})
+"""
+
+
+def fake_ffmpeg(tmp_path, frame_size, exit_code=0):
+    path = tmp_path / "ffmpeg"
+    path.write_text(FAKE_FFMPEG.format(python=sys.executable, frame_size=frame_size, exit_code=exit_code))
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+def frames(count=20, height=240, width=360):
+    return [np.zeros((height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def test_verbose_ffmpeg_does_not_block_the_frame_stream(tmp_path):
+    encoder = FFmpegEncoder(ffmpeg_path=fake_ffmpeg(tmp_path, 240 * 360 * 3))
+    output_path = str(tmp_path / "demo_1_video_1.mp4")
+    assert encoder.encode(frames(), output_path) == len(b"video")
+    assert sorted(os.listdir(tmp_path)) == ["demo_1_video_1.mp4", "ffmpeg"]
+
+
+def test_failed_encode_reports_stderr_and_removes_the_partial_file(tmp_path):
+    encoder = FFmpegEncoder(ffmpeg_path=fake_ffmpeg(tmp_path, 240 * 360 * 3, exit_code=1))
+    output_path = str(tmp_path / "demo_1_video_1.mp4")
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        encoder.encode(frames(), output_path)
+    assert b"error while encoding frame" in error.value.stderr
+    assert sorted(os.listdir(tmp_path)) == ["ffmpeg"]
@@ -1,4 +1,17 @@
-from .main_window import TextToVideoGUI
-from .video_grid import VideoGrid
-from .video_player import VideoPlayer
-from .resource_monitor import ResourceMonitor
\ No newline at end of file
+import importlib
+
+# Resolved on first access, so importing one widget does not load the others
+# (ResourceMonitor pulls in matplotlib)
+_EXPORTS = {
+    'TextToVideoGUI': '.main_window',
+    'VideoGrid': '.video_grid',
+    'VideoPlayer': '.video_player',
+    'ResourceMonitor': '.resource_monitor',
+}
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
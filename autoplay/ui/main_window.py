@@ -1,19 +1,18 @@
 import logging
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QProgressBar, QLabel, QScrollArea, QSpinBox, QFileDialog, QTextEdit, QComboBox, QSlider
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QProgressBar, QLabel, QScrollArea, QSpinBox, QFileDialog, QTextEdit, QComboBox, QSlider, QMessageBox
 from PyQt6.QtCore import Qt, QSettings, QThread, pyqtSignal
 from ui.video_grid import VideoGrid
-from ui.resource_monitor import ResourceMonitor
-from core.video_generator import VideoGenerator
+from core.cost_model import get_cost_model
 from core.dependency_installer import DependencyInstaller
+from core.prewarm import Prewarmer, prewarm_enabled
 from utils.queue_manager import QueueManager
-from openai import OpenAI
+from utils.job_store import JobStore
+from utils.catalog import Catalog
+from utils.scheduler import POLICIES
 from ui.prompt_panel import PromptPanel
 import time
 import os
 
-# Initialize OpenAI API client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
 class PromptGenerationWorker(QThread):
     prompts_generated = pyqtSignal(list)
     error_occurred = pyqtSignal(str)
@@ -25,21 +24,12 @@ class PromptGenerationWorker(QThread):
 
     def run(self):
         try:
-            prompts = []
-            for i in range(self.num_panels):
-                response = client.chat.completions.create(
-                    model="gpt-4-turbo-preview",
-                    messages=[
-                        {"role": "system", "content": "You are a creative assistant that generates prompts for text-to-video AI models."},
-                        {"role": "user", "content": f"Based on the following global intention, generate a creative and detailed prompt for this cinematic CogVideoX-5b scene {i+1} of a text-to-video AI model: {self.global_prompt}"}
-                    ]
-                )
-                prompts.append(response.choices[0].message.content.strip())
+            from core.ai_interface import get_prompt_expander  # Imports openai
+            # All panels are expanded concurrently; cached scenes return immediately
+            prompts = get_prompt_expander().expand(self.global_prompt, self.num_panels)
             self.prompts_generated.emit(prompts)
         except Exception as e:
             self.error_occurred.emit(str(e))
-            self.error_occurred.emit(f"Error generating prompts: {str(e)}")
-            self.error_occurred.emit(str(e))
 
 class TextToVideoGUI(QWidget):
     def __init__(self):
@@ -47,10 +37,17 @@ class TextToVideoGUI(QWidget):
         self.panels = []
         self.output_dir = ""
         self.queue_manager = QueueManager()
+        self.render_worker = None
+        self.catalog = None  # Index of the output directory's renders
+        self.resource_monitor = None
+        self.prewarmer = None  # Loads the heavy modules once the window is shown
+        self.backend_ready = False  # Torch and diffusers are imported
+        self.profile = None  # Execution profile, selected once for estimates and the render worker
+        self.installer = None
+        self.dependencies_ready = False  # Render dependencies were checked this session
         self.settings = QSettings("MicroFilm.AI", "AutoPlay")
         self.video_grid = VideoGrid()  # Initialize VideoGrid here
         self.init_ui()
-        self.open_resource_monitor()
         self.load_settings()
         self.video_grid.video_removed.connect(self.on_video_removed)
         self.queue_manager.queue_updated.connect(self.update_queue_ui)
@@ -120,9 +117,19 @@ class TextToVideoGUI(QWidget):
         self.output_dir_button.clicked.connect(self.select_output_directory)
         main_layout.addWidget(self.output_dir_button)
 
+        process_layout = QHBoxLayout()
         self.process_all_button = QPushButton('Process All Queues')
         self.process_all_button.clicked.connect(self.process_all_queues)
-        main_layout.addWidget(self.process_all_button)
+        process_layout.addWidget(self.process_all_button)
+        self.clear_queue_button = QPushButton('Clear Queue')
+        self.clear_queue_button.clicked.connect(self.clear_queue)
+        process_layout.addWidget(self.clear_queue_button)
+        process_layout.addWidget(QLabel("Scheduling:"))
+        self.policy_combo = QComboBox()
+        self.policy_combo.addItems(POLICIES)
+        self.policy_combo.currentTextChanged.connect(self.queue_manager.set_policy)
+        process_layout.addWidget(self.policy_combo)
+        main_layout.addLayout(process_layout)
 
         self.progress_bar = QProgressBar()
         main_layout.addWidget(self.progress_bar)
@@ -130,6 +137,9 @@ class TextToVideoGUI(QWidget):
         self.time_estimate_label = QLabel("Estimated time remaining: N/A")
         main_layout.addWidget(self.time_estimate_label)
 
+        self.queue_estimate_label = QLabel("Queue: empty")
+        main_layout.addWidget(self.queue_estimate_label)
+
         # Add the VideoGrid component
         self.video_grid = VideoGrid()
         main_layout.addWidget(self.video_grid)
@@ -138,8 +148,31 @@ class TextToVideoGUI(QWidget):
         self.setWindowTitle('AutoPlay By MicroFilm.AI')
         self.setGeometry(100, 100, 1200, 800)
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.prewarmer is not None:
+            return
+        self.prewarmer = Prewarmer()
+        if prewarm_enabled():
+            self.prewarmer.module_loaded.connect(self.on_module_prewarmed)
+            self.prewarmer.profile_selected.connect(self.on_profile_selected)
+            self.prewarmer.start()
+        else:
+            self.backend_ready = True  # Imported on first use instead
+            self.open_resource_monitor()
+
+    def on_module_prewarmed(self, name):
+        if name == 'ui.resource_monitor':
+            self.open_resource_monitor()
+
+    def on_profile_selected(self, profile):
+        self.profile = profile
+        self.backend_ready = True
+        self.update_queue_ui()
+
     def open_resource_monitor(self):
         try:
+            from ui.resource_monitor import ResourceMonitor  # Imports matplotlib
             self.resource_monitor = ResourceMonitor()  # Assuming ResourceMonitor is a valid widget in your app
             self.resource_monitor.show()
             logging.info("Resource monitor opened successfully.")
@@ -192,17 +225,56 @@ class TextToVideoGUI(QWidget):
                 panel.deleteLater()
 
     def select_output_directory(self):
-        self.output_dir = QFileDialog.getExistingDirectory(self, "Select Output Directory")
-        if self.output_dir:
+        # Queued jobs belong to the current directory's job store and render into it
+        if self.is_rendering() or self.queue_manager.has_items():
+            logging.warning("Finish or clear the queued jobs before switching the output directory")
+            return
+        output_dir = QFileDialog.getExistingDirectory(self, "Select Output Directory")
+        if output_dir:
+            self.output_dir = output_dir
             logging.info(f"Output directory set to: {self.output_dir}")
+            self.open_job_store()
+            self.open_catalog()
+
+    def open_job_store(self):
+        """Persists the queue next to the output and resumes jobs left unfinished."""
+        if self.is_rendering() or self.queue_manager.has_items() or not os.path.isdir(self.output_dir):
+            return
+        if self.queue_manager.store is not None:
+            self.queue_manager.store.close()
+        try:
+            self.queue_manager.attach_store(JobStore.for_output_dir(self.output_dir))
+        except Exception as e:
+            self.queue_manager.attach_store(None)
+            logging.error(f"Failed to open the job store in {self.output_dir}: {e}")
+            return
+
+        resumed = self.queue_manager.resume_from_store()
+        if resumed:
+            logging.info(f"Resuming {resumed} unfinished jobs from {self.output_dir}")
+            self.install_dependencies()
+
+    def open_catalog(self):
+        """Lists the output directory's past renders in the video grid and keeps them in sync."""
+        if self.is_rendering() or not os.path.isdir(self.output_dir):
+            return
+        if self.catalog is not None:
+            self.video_grid.set_catalog(None)
+            self.catalog.close()
+        try:
+            self.catalog = Catalog.for_output_dir(self.output_dir)
+        except Exception as e:
+            self.catalog = None
+            logging.error(f"Failed to open the video catalogue in {self.output_dir}: {e}")
+            return
+        self.video_grid.set_catalog(self.catalog)
 
     def process_all_queues(self):
         if not self.output_dir:
             logging.warning("Please select an output directory first")
             return
 
-        self.queue_manager.clear_queue()
-
+        # Items still queued (e.g. resumed after a restart) are rendered along with the panels'
         for panel in self.panels:
             for item in panel.render_queue:
                 self.queue_manager.add_to_queue(item)
@@ -213,9 +285,27 @@ class TextToVideoGUI(QWidget):
             logging.warning("All queues are empty")
             return
 
+        if self.is_rendering():
+            logging.info("New items handed to the running render worker")
+            return
+
         self.install_dependencies()
 
+    def clear_queue(self):
+        """Cancels every job that has not started; the one rendering now still finishes."""
+        for panel in self.panels:
+            panel.render_queue.clear()
+            panel.queue_list.clear()
+        self.queue_manager.clear_queue()
+        logging.info("Render queue cleared")
+
     def install_dependencies(self):
+        # Checked once per session; the installer also skips environments verified in earlier ones
+        if self.dependencies_ready:
+            self.start_render_worker()
+            return
+        if self.installer is not None and self.installer.isRunning():
+            return  # Rendering starts when the running check finishes
         self.installer = DependencyInstaller()
         self.installer.finished.connect(self.on_dependencies_installed)
         self.installer.progress.connect(self.progress_bar.setValue)
@@ -223,34 +313,31 @@ class TextToVideoGUI(QWidget):
 
     def on_dependencies_installed(self):
         logging.info("Dependencies installed successfully")
-        self.start_next_render()
+        self.dependencies_ready = True
+        self.start_render_worker()
 
-    def start_next_render(self):
-        if not self.queue_manager.has_items():
-            logging.info("All renders completed")
+    def is_rendering(self):
+        return self.render_worker is not None and self.render_worker.isRunning()
+
+    def start_render_worker(self):
+        if self.is_rendering():
             return
 
-        item = self.queue_manager.get_next_item()
-        if item is None:
-            logging.warning("No items left in the queue")
+        if not self.queue_manager.has_items():
+            logging.info("All renders completed")
             return
 
-        logging.info(f"Starting render for item: {item['project_name']}")
-        self.generator = VideoGenerator(
-            item['text'],
-            item['num_inference_steps'],
-            item['guidance_scale'],
-            item['num_frames'],
-            item['project_name'],
-            item['sequence_number'],
-            self.output_dir,
-            item['num_videos']
-        )
-        self.generator.finished.connect(self.on_video_generation_finished)
-        self.generator.progress.connect(self.progress_bar.setValue)
-        self.generator.time_estimate.connect(self.update_time_estimate)
-        self.generator.video_generated.connect(self.on_video_generated)
-        self.generator.start()
+        from core.render_worker import RenderWorker  # Imports torch and diffusers
+        self.render_worker = RenderWorker(self.queue_manager, self.output_dir, profile=self.profile, catalog=self.catalog)
+        self.render_worker.item_started.connect(self.update_queue_ui)
+        self.render_worker.item_finished.connect(self.on_video_generation_finished)
+        self.render_worker.item_failed.connect(self.on_render_item_failed)
+        self.render_worker.finished.connect(self.on_render_worker_finished)
+        self.render_worker.error_occurred.connect(self.handle_render_error)
+        self.render_worker.progress.connect(self.progress_bar.setValue)
+        self.render_worker.time_estimate.connect(self.update_time_estimate)
+        self.render_worker.video_generated.connect(self.on_video_generated)
+        self.render_worker.start()
 
     def generate_panel_prompts(self):
         global_prompt = self.global_prompt_input.toPlainText()
@@ -263,11 +350,23 @@ class TextToVideoGUI(QWidget):
         self.worker.error_occurred.connect(self.handle_error)
         self.worker.start()
 
-    def on_video_generation_finished(self):
+    def on_video_generation_finished(self, item=None):
         logging.info("Video generation completed")
         self.progress_bar.setValue(0)
         self.time_estimate_label.setText("Estimated time remaining: N/A")
-        self.start_next_render()
+
+    def on_render_item_failed(self, item, error_message):
+        logging.error(f"Render failed for {item['project_name']}: {error_message}")
+        self.on_video_generation_finished(item)
+
+    def on_render_worker_finished(self):
+        self.render_worker.wait()
+        if not self.render_worker.drained:
+            return  # Stopped or failed to load; restarting would undo the stop or load the model again
+        logging.info("All renders completed")
+        # Items queued right as the worker exited still need a worker
+        if self.queue_manager.has_items():
+            self.start_render_worker()
 
     def update_time_estimate(self, estimate):
         self.time_estimate_label.setText(estimate)
@@ -285,15 +384,30 @@ class TextToVideoGUI(QWidget):
 
     def show_video(self, video_path):
         self.video_grid.add_video(video_path)
-        self.start_next_render()
 
-    def update_queue_ui(self):
+    def update_queue_ui(self, *args):
         logging.info("Queue updated.")
+        items = self.queue_manager.pending_items()
+        if not items:
+            self.queue_estimate_label.setText("Queue: empty")
+            return
+        if not self.backend_ready and not self.is_rendering():
+            # The estimate needs the backend; it is refreshed once pre-warming has loaded it
+            self.queue_estimate_label.setText(f"Queue: {len(items)} jobs waiting")
+            return
+        from core.render_job import VIDEO_HEIGHT, VIDEO_WIDTH
+        if self.profile is None:
+            from services.pipeline_service import select_profile
+            self.profile = select_profile()
+        duration = get_cost_model().predict_queue(items, VIDEO_HEIGHT, VIDEO_WIDTH, self.profile)
+        estimate = f"about {self.video_grid.format_time(duration)}" if duration else "no timing history yet"
+        self.queue_estimate_label.setText(f"Queue: {len(items)} jobs waiting, {estimate}")
 
     def save_settings(self):
         self.settings.setValue("output_dir", self.output_dir)
         self.settings.setValue("panel_count", len(self.panels))
         self.settings.setValue("global_prompt", self.global_prompt_input.toPlainText())
+        self.settings.setValue("scheduling_policy", self.policy_combo.currentText())
         for i, panel in enumerate(self.panels):
             panel.save_settings(self.settings, i)
 
@@ -302,20 +416,33 @@ class TextToVideoGUI(QWidget):
         panel_count = int(self.settings.value("panel_count", 1))
         self.update_panel_count(panel_count)
         self.global_prompt_input.setPlainText(self.settings.value("global_prompt", ""))
+        self.policy_combo.setCurrentText(self.settings.value("scheduling_policy", POLICIES[0]))
+        if self.output_dir:
+            self.open_job_store()
+            self.open_catalog()
         # self.gpt_model_combo.setCurrentText(self.settings.value("gpt_model", "gpt-3.5-turbo"))
         for i, panel in enumerate(self.panels):
             panel.load_settings(self.settings, i)
 
     def closeEvent(self, event):
         self.save_settings()
+        if self.render_worker is not None:
+            self.render_worker.stop()
+        if self.prewarmer is not None:
+            self.prewarmer.wait()  # An import cannot be interrupted; Qt aborts if the thread outlives the window
         event.accept()
 
     def handle_error(self, error_message):
         logging.error(f"Error generating prompts: {error_message}")
         QMessageBox.critical(self, "Prompt Generation Error", error_message)
 
+    def handle_render_error(self, error_message):
+        self.on_video_generation_finished()
+        QMessageBox.critical(self, "Render Error", f"Rendering stopped: {error_message}")
+
     def start_video_generation(self):
         # ... code to set up video generation parameters ...
+        from core.video_generator import VideoGenerator
         self.video_generator = VideoGenerator(text, num_inference_steps, guidance_scale, num_frames, project_name, sequence_number, output_dir, num_videos)
         self.video_generator.finished.connect(self.on_video_generation_finished)
         self.video_generator.video_generated.connect(self.on_video_generated)
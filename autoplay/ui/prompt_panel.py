@@ -68,6 +68,15 @@ class PromptPanel(QFrame):
         videos_layout.addWidget(self.videos_spinbox)
         layout.addLayout(videos_layout)
 
+        # Priority input (higher priorities are rendered first)
+        priority_layout = QHBoxLayout()
+        priority_layout.addWidget(QLabel("Priority:"))
+        self.priority_spinbox = QSpinBox()
+        self.priority_spinbox.setRange(0, 10)
+        self.priority_spinbox.setValue(0)
+        priority_layout.addWidget(self.priority_spinbox)
+        layout.addLayout(priority_layout)
+
         # Add to queue button
         self.queue_button = QPushButton("Add to Queue")
         self.queue_button.clicked.connect(self.add_to_queue)
@@ -103,6 +112,7 @@ class PromptPanel(QFrame):
             "num_frames": self.frames_spinbox.value(),
             "sequence_number": self.current_sequence,
             "num_videos": self.videos_spinbox.value(),
+            "priority": self.priority_spinbox.value(),
         }
         self.render_queue.append(queue_item)
         self.queue_list.addItem(f"{project_name}_{self.current_sequence}")
@@ -115,6 +125,7 @@ class PromptPanel(QFrame):
         settings.setValue(f"{prefix}guidance_scale", self.guidance_slider.value())
         settings.setValue(f"{prefix}num_frames", self.frames_spinbox.value())
         settings.setValue(f"{prefix}num_videos", self.videos_spinbox.value())
+        settings.setValue(f"{prefix}priority", self.priority_spinbox.value())
 
     def load_settings(self, settings, index):
         prefix = f"panel_{index}_"
@@ -124,6 +135,7 @@ class PromptPanel(QFrame):
         self.guidance_slider.setValue(int(settings.value(f"{prefix}guidance_scale", 7)))
         self.frames_spinbox.setValue(int(settings.value(f"{prefix}num_frames", 49)))
         self.videos_spinbox.setValue(int(settings.value(f"{prefix}num_videos", 1)))
+        self.priority_spinbox.setValue(int(settings.value(f"{prefix}priority", 0)))
 
     def sizeHint(self):
         return QSize(400, 600)
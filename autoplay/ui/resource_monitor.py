@@ -1,53 +1,68 @@
-import os
-import psutil
-import subprocess
-import time
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
+import math
+from collections import deque
+import numpy as np
+from matplotlib.figure import Figure
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QProgressBar, QLabel
-from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtCore import pyqtSignal, QTimer
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from utils.metrics import MetricsSampler
+
+TOTAL_CUDA_CORES = 16384  # RTX 4090
+DEFAULT_VRAM_MB = 24576  # Used until the sampler reports the real total
+
+LINE_SERIES = [
+    ('cpu_usage', 'blue', 'CPU Usage (%)'),
+    ('gpu_usage', 'green', 'GPU Usage (%)'),
+    ('cuda_mem', 'red', 'CUDA Memory (MB)'),
+    ('gpu_wattage', 'orange', 'GPU Wattage (W)'),
+    ('cuda_cores', 'purple', 'CUDA Cores (x100)'),
+]
+
+
+class BlitManager:
+    """Redraws only a canvas's animated artists on top of a cached background.
+
+    A full draw (on resize, or after the axes limits change) refreshes the
+    background; every other frame restores it and paints just the artists.
+    """
+
+    def __init__(self, canvas, artists):
+        self.canvas = canvas
+        self.artists = artists
+        self.background = None
+        for artist in artists:
+            artist.set_animated(True)
+        canvas.mpl_connect('draw_event', self.on_draw)
+
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self.draw_artists()
+
+    def draw_artists(self):
+        for artist in self.artists:
+            self.canvas.figure.draw_artist(artist)
+
+    def update(self):
+        if self.background is None:
+            self.canvas.draw()  # Caches the background through on_draw
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_artists()
+        self.canvas.blit(self.canvas.figure.bbox)
 
-class GpuMonitorThread(QThread):
-    gpu_data_signal = pyqtSignal(tuple)
-
-    def run(self):
-        while True:
-            gpu_util, cuda_mem, gpu_wattage, cuda_cores = self.get_gpu_usage()
-            self.gpu_data_signal.emit((gpu_util, cuda_mem, gpu_wattage, cuda_cores))
-            time.sleep(1)
-
-    def get_gpu_usage(self):
-        try:
-            result = subprocess.check_output(['nvidia-smi', '--query-gpu=utilization.gpu,memory.used,power.draw,utilization.memory',
-                                              '--format=csv,noheader,nounits'], text=True)
-            gpu_util, mem_used, power_draw, mem_util = map(float, result.strip().split(', '))
-            
-            total_cores = 16384  # Correct CUDA core count for RTX 4090
-            cuda_cores = int((mem_util / 100) * total_cores)
-            
-            return int(gpu_util), int(mem_used), int(float(power_draw)), cuda_cores
-        except Exception as e:
-            print(f"Error fetching GPU info: {e}")
-            return 0, 0, 0, 0
-
-class CpuMonitorThread(QThread):
-    cpu_usage_signal = pyqtSignal(int)
-
-    def run(self):
-        while True:
-            cpu_util = psutil.cpu_percent(interval=1)
-            self.cpu_usage_signal.emit(cpu_util)
 
 class ResourceMonitor(QWidget):
-    def __init__(self):
+    sample_received = pyqtSignal(object)  # MetricsSample, emitted from the sampler thread
+
+    def __init__(self, interval=None):
         super().__init__()
         self.setWindowTitle("Comprehensive System Resource Monitor")
         self.setGeometry(100, 100, 1200, 800)
+        self.interval = interval  # Seconds between samples, None for AUTOPLAY_METRICS_INTERVAL or 1s
 
-        self.setup_ui()
         self.setup_data()
-        self.setup_threads()
+        self.setup_sampler()
+        self.setup_ui()
         self.setup_animations()
 
     def setup_ui(self):
@@ -67,50 +82,103 @@ class ResourceMonitor(QWidget):
         left_layout.addWidget(self.wattage_label)
         left_layout.addWidget(self.cores_label)
 
-        # Matplotlib figures
-        self.fig_line, self.ax_line = plt.subplots(figsize=(8, 4))
+        # Matplotlib figures; the artists are created once and only their data changes
+        self.fig_line = Figure(figsize=(8, 4))
+        self.ax_line = self.fig_line.add_subplot()
         self.canvas_line = FigureCanvas(self.fig_line)
         right_layout.addWidget(self.canvas_line)
 
-        self.fig_pie, (self.ax_pie1, self.ax_pie2) = plt.subplots(1, 2, figsize=(8, 4))
+        self.fig_pie = Figure(figsize=(8, 4))
+        self.ax_pie1, self.ax_pie2 = self.fig_pie.subplots(1, 2)
         self.canvas_pie = FigureCanvas(self.fig_pie)
         right_layout.addWidget(self.canvas_pie)
 
+        self.setup_line_plot()
+        self.setup_pie_charts()
+
         main_layout.addLayout(left_layout)
         main_layout.addLayout(right_layout)
         self.setLayout(main_layout)
 
     def setup_data(self):
-        self.data = {
-            'cpu_usage': [0],
-            'gpu_usage': [0],
-            'cuda_mem': [0],
-            'gpu_wattage': [0],
-            'cuda_cores': [0]
-        }
         self.max_data_points = 60
+        # Fixed-size ring buffers: appending drops the oldest sample in O(1)
+        self.data = {key: deque([0] * self.max_data_points, maxlen=self.max_data_points) for key, _, _ in LINE_SERIES}
+        self.vram_total_mb = DEFAULT_VRAM_MB
+        self.dirty = False  # New samples since the charts were last drawn
+
+    def setup_line_plot(self):
+        x = np.arange(self.max_data_points) * self.sampler.interval
+        self.lines = {}
+        for key, color, label in LINE_SERIES:
+            self.lines[key], = self.ax_line.plot(x, np.zeros(self.max_data_points), color=color, label=label)
+        self.ax_line.legend(loc='upper left')
+        self.ax_line.set_ylim([0, 110])
+        self.ax_line.set_xlim([0, x[-1]])
+        self.ax_line.set_title("Real-Time System Resource Usage")
+        self.ax_line.set_xlabel("Time (s)")
+        self.ax_line.set_ylabel("Usage")
+        self.ax_line.grid(True)
+        self.line_blitter = BlitManager(self.canvas_line, list(self.lines.values()))
 
-    def setup_threads(self):
-        self.gpu_thread = GpuMonitorThread()
-        self.gpu_thread.gpu_data_signal.connect(self.update_gpu_data)
-        self.gpu_thread.start()
+    def setup_pie_charts(self):
+        self.pie1 = self.ax_pie1.pie([1, 1, 1, 1],
+                                     labels=['CPU Used', 'CPU Free', 'GPU Used', 'GPU Free'],
+                                     colors=['blue', 'lightblue', 'green', 'lightgreen'],
+                                     autopct='%1.1f%%', startangle=90)
+        self.ax_pie1.set_title("CPU and GPU Usage")
+        self.pie2 = self.ax_pie2.pie([1, 1, 1, 1],
+                                     labels=['CUDA Mem Used', 'CUDA Mem Free', 'CUDA Cores Used', 'CUDA Cores Free'],
+                                     colors=['red', 'pink', 'purple', 'lavender'],
+                                     autopct='%1.1f%%', startangle=90)
+        self.ax_pie2.set_title("CUDA Memory and Cores Usage")
+        pie_artists = [artist for pie in (self.pie1, self.pie2) for group in pie for artist in group]
+        self.pie_blitter = BlitManager(self.canvas_pie, pie_artists)
 
-        self.cpu_thread = CpuMonitorThread()
-        self.cpu_thread.cpu_usage_signal.connect(self.update_cpu_usage)
-        self.cpu_thread.start()
+    def setup_sampler(self):
+        # One in-process sampler replaces polling nvidia-smi and psutil on two threads
+        self.sample_received.connect(self.update_sample)
+        self.sampler = MetricsSampler(self.interval, on_sample=self.sample_received.emit)
 
     def setup_animations(self):
-        self.ani_line = FuncAnimation(self.fig_line, self.update_line_plot, interval=1000, cache_frame_data=False)
-        self.ani_pie = FuncAnimation(self.fig_pie, self.update_pie_charts, interval=1000, cache_frame_data=False)
+        # A single timer redraws both charts, at most once per sample
+        self.redraw_timer = QTimer(self)
+        self.redraw_timer.setInterval(int(self.sampler.interval * 1000))
+        self.redraw_timer.timeout.connect(self.redraw)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.sampler.start()
+        self.redraw_timer.start()
+
+    def hideEvent(self, event):
+        # Nothing is drawn or sampled while the window is hidden or minimised
+        self.redraw_timer.stop()
+        self.sampler.stop()
+        super().hideEvent(event)
+
+    def update_sample(self, sample):
+        self.update_cpu_usage(sample.cpu_percent or 0)
+        if sample.gpu_mem_total_mb:
+            self.vram_total_mb = int(sample.gpu_mem_total_mb)
+        cuda_cores = int((sample.gpu_memory_percent or 0) / 100 * TOTAL_CUDA_CORES)
+        self.update_gpu_data((
+            int(sample.gpu_percent or 0),
+            int(sample.gpu_mem_used_mb or 0),
+            int(sample.gpu_power_w or 0),
+            cuda_cores,
+        ))
+        self.dirty = True
 
     def update_cpu_usage(self, cpu_util):
-        self.cpu_progress.setValue(cpu_util)
+        self.cpu_progress.setValue(int(cpu_util))
         self.update_data('cpu_usage', cpu_util)
 
     def update_gpu_data(self, gpu_data):
         gpu_util, cuda_mem, gpu_wattage, cuda_cores = gpu_data
         self.gpu_progress.setValue(gpu_util)
-        self.cuda_memory_progress.setValue(min(cuda_mem, 24576))  # Assuming 24GB VRAM
+        self.cuda_memory_progress.setMaximum(self.vram_total_mb)
+        self.cuda_memory_progress.setValue(min(cuda_mem, self.vram_total_mb))
         self.wattage_label.setText(f"GPU Power Usage: {gpu_wattage} W")
         self.cores_label.setText(f"Estimated CUDA Cores in Use: {cuda_cores}")
 
@@ -121,58 +189,57 @@ class ResourceMonitor(QWidget):
 
     def update_data(self, key, value):
         self.data[key].append(max(0, value))  # Ensure non-negative values
-        if len(self.data[key]) > self.max_data_points:
-            self.data[key].pop(0)
-
-    def update_line_plot(self, frame):
-        self.ax_line.clear()
-        x = list(range(len(max(self.data.values(), key=len))))  # Use the longest data list for x-axis
-        
-        for key, color, label in [
-            ('cpu_usage', 'blue', 'CPU Usage (%)'),
-            ('gpu_usage', 'green', 'GPU Usage (%)'),
-            ('cuda_mem', 'red', 'CUDA Memory (MB)'),
-            ('gpu_wattage', 'orange', 'GPU Wattage (W)'),
-            ('cuda_cores', 'purple', 'CUDA Cores (x100)')
-        ]:
-            y = self.data[key]
-            if key == 'cuda_cores':
-                y = [core / 100 for core in y]
-            # Pad y with zeros if it's shorter than x
-            y = y + [0] * (len(x) - len(y))
-            self.ax_line.plot(x, y, color=color, label=label)
-
-        self.ax_line.legend(loc='upper left')
-        max_value = max(max(max(data) for data in self.data.values()), 100)
-        self.ax_line.set_ylim([0, max_value * 1.1])
-        self.ax_line.set_xlim([0, self.max_data_points - 1])
-        self.ax_line.set_title("Real-Time System Resource Usage")
-        self.ax_line.set_xlabel("Time (s)")
-        self.ax_line.set_ylabel("Usage")
-        self.ax_line.grid(True)
-        
-        self.canvas_line.draw()
 
-    def update_pie_charts(self, frame):
-        self.ax_pie1.clear()
-        self.ax_pie2.clear()
+    def redraw(self):
+        if not self.dirty:
+            return
+        self.dirty = False
+        self.update_line_plot()
+        self.update_pie_charts()
 
+    def update_line_plot(self):
+        for key, line in self.lines.items():
+            y = np.fromiter(self.data[key], dtype=float, count=self.max_data_points)
+            if key == 'cuda_cores':
+                y /= 100
+            line.set_ydata(y)
+
+        # Rescaling the axis needs a full draw; everything else is blitted
+        max_value = max(max(max(data) for data in self.data.values()), 100) * 1.1
+        _, top = self.ax_line.get_ylim()
+        if max_value > top or max_value < top / 2:
+            self.ax_line.set_ylim([0, max_value])
+            self.canvas_line.draw()
+        else:
+            self.line_blitter.update()
+
+    def update_pie_charts(self):
         cpu = max(0, min(100, self.data['cpu_usage'][-1]))
         gpu = max(0, min(100, self.data['gpu_usage'][-1]))
-        self.ax_pie1.pie([cpu, 100-cpu, gpu, 100-gpu], 
-                         labels=['CPU Used', 'CPU Free', 'GPU Used', 'GPU Free'],
-                         colors=['blue', 'lightblue', 'green', 'lightgreen'],
-                         autopct='%1.1f%%', startangle=90)
-        self.ax_pie1.set_title("CPU and GPU Usage")
-
-        cuda_mem = max(0, min(24576, self.data['cuda_mem'][-1]))  # Assuming 24GB VRAM
-        cuda_cores = max(0, min(16384, self.data['cuda_cores'][-1]))  # Corrected for RTX 4090
-        total_mem = 24576  # 24GB for RTX 4090
-        total_cores = 16384  # Corrected for RTX 4090
-        self.ax_pie2.pie([cuda_mem, total_mem-cuda_mem, cuda_cores, total_cores-cuda_cores],
-                         labels=['CUDA Mem Used', 'CUDA Mem Free', 'CUDA Cores Used', 'CUDA Cores Free'],
-                         colors=['red', 'pink', 'purple', 'lavender'],
-                         autopct='%1.1f%%', startangle=90)
-        self.ax_pie2.set_title("CUDA Memory and Cores Usage")
-
-        self.canvas_pie.draw()
\ No newline at end of file
+        self.update_pie(self.pie1, [cpu, 100-cpu, gpu, 100-gpu])
+
+        total_mem = self.vram_total_mb
+        total_cores = TOTAL_CUDA_CORES
+        cuda_mem = max(0, min(total_mem, self.data['cuda_mem'][-1]))
+        cuda_cores = max(0, min(total_cores, self.data['cuda_cores'][-1]))
+        self.update_pie(self.pie2, [cuda_mem, total_mem-cuda_mem, cuda_cores, total_cores-cuda_cores])
+
+        self.pie_blitter.update()
+
+    @staticmethod
+    def update_pie(pie, values, startangle=90):
+        """Moves existing wedges and labels to new values, laid out as Axes.pie() does."""
+        wedges, labels, percentages = pie
+        total = sum(values) or 1
+        theta = startangle
+        for wedge, label, percentage, value in zip(wedges, labels, percentages, values):
+            span = 360 * value / total
+            wedge.set_theta1(theta)
+            wedge.set_theta2(theta + span)
+            middle = math.radians(theta + span / 2)
+            x, y = math.cos(middle), math.sin(middle)
+            label.set_position((1.1 * x, 1.1 * y))
+            label.set_horizontalalignment('left' if x > 0 else 'right')
+            percentage.set_position((0.6 * x, 0.6 * y))
+            percentage.set_text(f"{100 * value / total:.1f}%")
+            theta += span
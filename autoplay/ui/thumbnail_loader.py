@@ -0,0 +1,149 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt6.QtGui import QColor, QImage, QPixmap
+from utils.catalog import thumbnail_key
+
+THUMBNAIL_WIDTH = 200
+THUMBNAIL_HEIGHT = 150
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".autoplay", "thumbnails")
+
+
+def decode_thumbnail(video_path):
+    """Decodes the first frame of a video into a thumbnail-sized QImage (null on failure)."""
+    import cv2  # Imported by the first cache miss on a worker thread, not at startup
+    cap = cv2.VideoCapture(video_path)
+    ret, frame = cap.read()
+    cap.release()
+    if not ret:
+        return QImage()
+    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    h, w, ch = frame.shape
+    image = QImage(frame.data, w, h, ch * w, QImage.Format.Format_RGB888)
+    # scaled() returns a copy, so the image no longer points into the frame buffer
+    return image.scaled(
+        THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT,
+        Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
+    )
+
+
+class _LoaderSignals(QObject):
+    loaded = pyqtSignal(str, QImage)
+
+
+class _LoadTask(QRunnable):
+    def __init__(self, loader):
+        super().__init__()
+        self.loader = loader
+
+    def run(self):
+        self.loader.work()
+
+
+class ThumbnailLoader(QObject):
+    """Loads video thumbnails off the GUI thread.
+
+    get() returns a cached QPixmap or None and queues the video for loading;
+    thumbnail_ready(path) fires once it is available. Workers read the
+    thumbnail from a disk cache of small JPEGs keyed by thumbnail_key() and
+    only decode the video on a miss. The most recently requested videos are
+    loaded first, so after a fast scroll the rows in view come up before the
+    ones scrolled past.
+    """
+    thumbnail_ready = pyqtSignal(str)
+
+    def __init__(self, cache_dir=None, max_pixmaps=512, max_pending=256, workers=2, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir or os.getenv("AUTOPLAY_THUMBNAIL_DIR", DEFAULT_CACHE_DIR)
+        self.max_pixmaps = max_pixmaps
+        self.max_pending = max_pending
+        self.workers = workers
+        self._pixmaps = OrderedDict()  # video_path -> QPixmap, least recently used first
+        self._pending = OrderedDict()  # video_path -> None, most recently requested last
+        self._active = 0
+        self._lock = threading.Lock()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(workers)
+        self._signals = _LoaderSignals()
+        self._signals.loaded.connect(self._on_loaded)  # Queued: runs on the GUI thread
+        self._placeholder = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError as e:
+            logging.warning(f"Thumbnail cache disabled, cannot create {self.cache_dir}: {e}")
+            self.cache_dir = None
+
+    def placeholder(self):
+        if self._placeholder is None:
+            self._placeholder = QPixmap(THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT)
+            self._placeholder.fill(QColor(60, 60, 60))
+        return self._placeholder
+
+    def get(self, video_path):
+        """Returns the thumbnail if it is loaded, otherwise queues it and returns None."""
+        pixmap = self._pixmaps.get(video_path)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(video_path)
+            return pixmap
+
+        with self._lock:
+            self._pending[video_path] = None
+            self._pending.move_to_end(video_path)
+            while len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)  # Long scrolled past; requested again if shown
+            start_worker = self._active < self.workers
+            if start_worker:
+                self._active += 1
+        if start_worker:
+            self._pool.start(_LoadTask(self))
+        return None
+
+    def forget(self, video_path):
+        with self._lock:
+            self._pending.pop(video_path, None)
+        self._pixmaps.pop(video_path, None)
+
+    def work(self):
+        """Worker loop: loads queued thumbnails, newest request first, until none are left."""
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._active -= 1
+                    return
+                video_path, _ = self._pending.popitem(last=True)
+            try:
+                image = self.load(video_path)
+            except Exception as e:
+                logging.error(f"Failed to create thumbnail for {video_path}: {e}")
+                image = QImage()
+            self._signals.loaded.emit(video_path, image)
+
+    def load(self, video_path):
+        """Reads the thumbnail from the disk cache, decoding and caching it on a miss."""
+        cache_path = None
+        if self.cache_dir:
+            cache_path = os.path.join(self.cache_dir, f"{thumbnail_key(video_path)}.jpg")
+            if os.path.exists(cache_path):
+                image = QImage(cache_path)
+                if not image.isNull():
+                    return image
+
+        image = decode_thumbnail(video_path)
+        if image.isNull():
+            logging.error(f"Failed to create thumbnail for: {video_path}")
+        elif cache_path:
+            temp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+            if image.save(temp_path, "JPG", 85):
+                os.replace(temp_path, cache_path)
+        return image
+
+    def _on_loaded(self, video_path, image):
+        # QPixmaps may only be created on the GUI thread
+        pixmap = QPixmap.fromImage(image) if not image.isNull() else self.placeholder()
+        self._pixmaps[video_path] = pixmap
+        self._pixmaps.move_to_end(video_path)
+        while len(self._pixmaps) > self.max_pixmaps:
+            self._pixmaps.popitem(last=False)
+        self.thumbnail_ready.emit(video_path)
@@ -1,35 +1,253 @@
 import os
 import logging
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, 
-                             QScrollArea, QMessageBox, QTableWidget, 
-                             QTableWidgetItem, QHeaderView, QPushButton)
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QPixmap, QImage
-import cv2
+import threading
+import time
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QMessageBox, QTableView, QHeaderView,
+                             QAbstractItemView, QStyledItemDelegate, QStyleOptionButton,
+                             QStyle, QApplication, QLineEdit)
+from PyQt6.QtCore import (Qt, pyqtSignal, QAbstractTableModel, QModelIndex, QEvent, QRect,
+                          QSortFilterProxyModel, QFileSystemWatcher, QTimer)
+from ui.thumbnail_loader import THUMBNAIL_HEIGHT, ThumbnailLoader
 from ui.video_player import VideoPlayer
 
+VIDEO_PATH_ROLE = Qt.ItemDataRole.UserRole
+SORT_ROLE = Qt.ItemDataRole.UserRole + 1
+FILTER_ROLE = Qt.ItemDataRole.UserRole + 2
+
+THUMBNAIL_COLUMN, NAME_COLUMN, TIME_COLUMN, ACTIONS_COLUMN = range(4)
+
+
+def format_time(seconds):
+    if seconds is None:
+        return "Unknown"
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours > 0:
+        return f"{hours}h {minutes}m {seconds}s"
+    elif minutes > 0:
+        return f"{minutes}m {seconds}s"
+    else:
+        return f"{seconds:.2f}s"
+
+
+class VideoTableModel(QAbstractTableModel):
+    """Rendered videos, one record dict (path, generation_time, prompt, ...) per row.
+
+    The model holds no widgets. A thumbnail is requested from the loader the
+    first time its row is painted, shown as a placeholder until it arrives,
+    and kept in the loader's bounded LRU, so memory stays flat however many
+    clips the output folder holds.
+    """
+    HEADERS = ['Thumbnail', 'Video Name', 'Generation Time', 'Actions']
+
+    def __init__(self, parent=None, thumbnail_loader=None):
+        super().__init__(parent)
+        self.videos = []  # Records in row order
+        self.rows = {}  # video_path -> row
+        self.thumbnails = thumbnail_loader or ThumbnailLoader(parent=self)
+        self.thumbnails.thumbnail_ready.connect(self.on_thumbnail_ready)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.videos)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self.videos[index.row()]
+        video_path = record['path']
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == NAME_COLUMN:
+                return os.path.basename(video_path)
+            if column == TIME_COLUMN:
+                return format_time(record.get('generation_time'))
+            if column == ACTIONS_COLUMN:
+                return "Remove"
+        elif role == SORT_ROLE:
+            if column == NAME_COLUMN:
+                return os.path.basename(video_path).lower()
+            if column == TIME_COLUMN:
+                generation_time = record.get('generation_time')
+                return generation_time if generation_time is not None else -1.0
+            return record.get('created_at') or 0.0  # Other columns sort by age
+        elif role == FILTER_ROLE:
+            return f"{os.path.basename(video_path)} {record.get('prompt') or ''}"
+        elif role == Qt.ItemDataRole.DecorationRole and column == THUMBNAIL_COLUMN:
+            pixmap = self.thumbnails.get(video_path)
+            return pixmap if pixmap is not None else self.thumbnails.placeholder()
+        elif role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        elif role == Qt.ItemDataRole.ToolTipRole:
+            return record.get('prompt') or video_path
+        elif role == VIDEO_PATH_ROLE:
+            return video_path
+        return None
+
+    def on_thumbnail_ready(self, video_path):
+        row = self.rows.get(video_path)
+        if row is not None:
+            index = self.index(row, THUMBNAIL_COLUMN)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def contains(self, video_path):
+        return video_path in self.rows
+
+    def set_videos(self, records):
+        """Replaces every row, e.g. with a catalogue's records."""
+        self.beginResetModel()
+        self.videos = list(records)
+        self.rows = {record['path']: row for row, record in enumerate(self.videos)}
+        self.endResetModel()
+
+    def add_video(self, video_path, generation_time=None, prompt=None):
+        """Appends a row; returns False if the video is already listed."""
+        if video_path in self.rows:
+            return False
+        self.update_video({
+            'path': video_path,
+            'generation_time': generation_time,
+            'prompt': prompt,
+            'created_at': time.time(),
+        })
+        return True
+
+    def update_video(self, record):
+        """Adds a record, or merges it into the existing row for the same path."""
+        row = self.rows.get(record['path'])
+        if row is None:
+            row = len(self.videos)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.videos.append(dict(record))
+            self.rows[record['path']] = row
+            self.endInsertRows()
+            return
+        current = self.videos[row]
+        current.update({key: value for key, value in record.items() if value is not None})
+        self.thumbnails.forget(record['path'])  # The file may have been rewritten
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+    def remove_video(self, video_path):
+        row = self.rows.pop(video_path, None)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.videos[row]
+        for record in self.videos[row:]:
+            self.rows[record['path']] -= 1
+        self.endRemoveRows()
+        self.thumbnails.forget(video_path)
+
+
+class VideoItemDelegate(QStyledItemDelegate):
+    """Paints the thumbnail and Remove button cells and turns clicks on them into signals."""
+    play_requested = pyqtSignal(str)
+    remove_requested = pyqtSignal(str)
+
+    def paint(self, painter, option, index):
+        column = index.column()
+        if column == THUMBNAIL_COLUMN:
+            pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+            if pixmap is not None and not pixmap.isNull():
+                size = pixmap.size()
+                if size.width() > option.rect.width() or size.height() > option.rect.height():
+                    size = size.scaled(option.rect.size(), Qt.AspectRatioMode.KeepAspectRatio)
+                target = QRect(0, 0, size.width(), size.height())
+                target.moveCenter(option.rect.center())
+                painter.drawPixmap(target, pixmap)
+        elif column == ACTIONS_COLUMN:
+            button = QStyleOptionButton()
+            button.rect = self.button_rect(option.rect)
+            button.text = index.data()
+            button.state = QStyle.StateFlag.State_Enabled
+            style = option.widget.style() if option.widget is not None else QApplication.style()
+            style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, option.widget)
+        else:
+            super().paint(painter, option, index)
+
+    @staticmethod
+    def button_rect(cell_rect):
+        width = min(100, cell_rect.width() - 16)
+        rect = QRect(0, 0, width, 30)
+        rect.moveCenter(cell_rect.center())
+        return rect
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            video_path = index.data(VIDEO_PATH_ROLE)
+            if index.column() == THUMBNAIL_COLUMN:
+                self.play_requested.emit(video_path)
+                return True
+            if index.column() == ACTIONS_COLUMN and self.button_rect(option.rect).contains(event.position().toPoint()):
+                self.remove_requested.emit(video_path)
+                return True
+        return super().editorEvent(event, model, option, index)
+
+
 class VideoGrid(QWidget):
+    """Lists the videos of the output directory.
+
+    With a catalogue attached, past renders are listed straight from its
+    index, and a filesystem watcher rescans the directory in the background
+    whenever files appear or disappear.
+    """
     video_removed = pyqtSignal(str)
+    scanned = pyqtSignal(object, list, list)  # Catalogue, added or changed records, removed paths
 
     def __init__(self):
         super().__init__()
+        self.model = VideoTableModel(self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setSortRole(SORT_ROLE)
+        self.proxy.setFilterRole(FILTER_ROLE)
+        self.proxy.setFilterKeyColumn(NAME_COLUMN)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.catalog = None
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.schedule_scan)
+        self.scan_timer = QTimer(self)  # Coalesces bursts of directory changes into one scan
+        self.scan_timer.setSingleShot(True)
+        self.scan_timer.setInterval(500)
+        self.scan_timer.timeout.connect(self.start_scan)
+        self.scanned.connect(self.apply_scan)
+        self._scanning = False
+        self._rescan = False
         self.init_ui()
-        self.video_info = []  # List of tuples (video_path, generation_time)
 
     def init_ui(self):
         self.layout = QVBoxLayout(self)
-        
-        self.table = QTableWidget()
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(['Thumbnail', 'Video Name', 'Generation Time', 'Actions'])
+
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter by name or prompt")
+        self.filter_input.textChanged.connect(self.proxy.setFilterFixedString)
+        self.layout.addWidget(self.filter_input)
+
+        # Rows are painted by the delegate, so only the visible ones cost anything
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.setSortingEnabled(True)
+        self.delegate = VideoItemDelegate(self.table)
+        self.delegate.play_requested.connect(self.play_video)
+        self.delegate.remove_requested.connect(self.remove_video)
+        self.table.setItemDelegate(self.delegate)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.table.verticalHeader().setVisible(False)
-        self.table.setSelectionMode(QTableWidget.SelectionMode.NoSelection)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        
-        # Set row height
-        self.table.verticalHeader().setDefaultSectionSize(150)
-        
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+
+        # Fixed row height, so the view never measures rows it is not showing
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(THUMBNAIL_HEIGHT)
+
         self.layout.addWidget(self.table)
 
     def add_video(self, video_path, generation_time=None):
@@ -38,92 +256,72 @@ class VideoGrid(QWidget):
             logging.error(f"Video file does not exist: {video_path}")
             return
 
-        if video_path not in [info[0] for info in self.video_info]:
-            self.video_info.append((video_path, generation_time))
-            logging.info(f"Video added to info list: {video_path}")
-            self.update_table()
+        if self.model.add_video(video_path, generation_time):
+            logging.info(f"Video added to grid: {video_path}")
         else:
             logging.info(f"Video already in grid: {video_path}")
 
-    def update_table(self):
-        logging.info(f"Updating table with {len(self.video_info)} videos")
-        self.table.setRowCount(len(self.video_info))
-        for row, (video_path, generation_time) in enumerate(self.video_info):
-            self.set_table_row(row, video_path, generation_time)
-        self.table.resizeColumnsToContents()
-        self.table.resizeRowsToContents()
-        logging.info("Table update completed")
-
-    def set_table_row(self, row, video_path, generation_time):
-        logging.info(f"Setting row {row} for video: {video_path}")
-        
-        # Thumbnail
-        thumbnail = self.create_video_thumbnail(video_path)
-        self.table.setCellWidget(row, 0, thumbnail)
-
-        # Video Name
-        name_item = QTableWidgetItem(os.path.basename(video_path))
-        name_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.table.setItem(row, 1, name_item)
-
-        # Generation Time
-        time_item = QTableWidgetItem(self.format_time(generation_time))
-        time_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.table.setItem(row, 2, time_item)
-
-        # Remove Button
-        remove_button = QPushButton("Remove")
-        remove_button.clicked.connect(lambda: self.remove_video(video_path))
-        self.table.setCellWidget(row, 3, remove_button)
-
-    def create_video_thumbnail(self, video_path):
-        thumbnail_label = QLabel()
-        thumbnail_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        cap = cv2.VideoCapture(video_path)
-        ret, frame = cap.read()
-        if ret:
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = frame.shape
-            bytes_per_line = ch * w
-            q_img = QImage(frame.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-            pixmap = QPixmap.fromImage(q_img)
-            thumbnail_label.setPixmap(pixmap.scaled(200, 150, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
-            logging.info(f"Thumbnail created for: {video_path}")
-        else:
-            logging.error(f"Failed to create thumbnail for: {video_path}")
-        cap.release()
-        thumbnail_label.mousePressEvent = lambda event: self.play_video(video_path)
-        return thumbnail_label
-
-
-
-    def format_time(self, seconds):
-        if seconds is None:
-            return "Unknown"
-        hours, remainder = divmod(int(seconds), 3600)
-        minutes, seconds = divmod(remainder, 60)
-        if hours > 0:
-            return f"{hours}h {minutes}m {seconds}s"
-        elif minutes > 0:
-            return f"{minutes}m {seconds}s"
-        else:
-            return f"{seconds:.2f}s"
+    def set_catalog(self, catalog):
+        """Lists the catalogue's videos and keeps them in sync with its directory."""
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+        self.catalog = catalog
+        if catalog is None:
+            self.model.set_videos([])
+            return
+        self.model.set_videos(catalog.videos())
+        self.watcher.addPath(catalog.output_dir)
+        self.start_scan()  # Pick up files changed while the app was closed
+
+    def schedule_scan(self, *args):
+        self.scan_timer.start()
+
+    def start_scan(self):
+        if self.catalog is None:
+            return
+        if self._scanning:
+            self._rescan = True
+            return
+        self._scanning = True
+        threading.Thread(target=self._scan, args=(self.catalog,), daemon=True).start()
+
+    def _scan(self, catalog):
+        try:
+            changed, removed = catalog.scan()
+        except Exception as e:
+            logging.error(f"Failed to scan {catalog.output_dir}: {e}")
+            changed, removed = [], []
+        self.scanned.emit(catalog, changed, removed)  # Delivered on the GUI thread
+
+    def apply_scan(self, catalog, changed, removed):
+        self._scanning = False
+        if catalog is self.catalog:
+            for record in changed:
+                self.model.update_video(record)
+            for video_path in removed:
+                self.model.remove_video(video_path)
+        if self._rescan:
+            self._rescan = False
+            self.start_scan()
+
+    format_time = staticmethod(format_time)
 
     def play_video(self, video_path):
         self.video_player = VideoPlayer(video_path)
         self.video_player.show()
 
     def remove_video(self, video_path):
-        reply = QMessageBox.question(self, 'Remove Video', 
+        reply = QMessageBox.question(self, 'Remove Video',
                                      f"Are you sure you want to remove {os.path.basename(video_path)}?",
-                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, 
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
                                      QMessageBox.StandardButton.No)
 
         if reply == QMessageBox.StandardButton.Yes:
             try:
                 os.remove(video_path)
-                self.video_info = [info for info in self.video_info if info[0] != video_path]
-                self.update_table()
+                self.model.remove_video(video_path)
+                if self.catalog is not None:
+                    self.catalog.remove(video_path)
                 self.video_removed.emit(video_path)
             except Exception as e:
-                QMessageBox.warning(self, 'Error', f"Failed to remove video: {str(e)}")
\ No newline at end of file
+                QMessageBox.warning(self, 'Error', f"Failed to remove video: {str(e)}")
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+CATALOG_FILENAME = ".autoplay_catalog.sqlite3"
+
+# Output names written by RenderJob.output_path()
+VIDEO_NAME = re.compile(r'^(?P<project>.+)_(?P<sequence>\d+)_video_(?P<index>\d+)\.mp4$')
+
+COLUMNS = (
+    'name', 'project', 'sequence', 'video_index', 'prompt', 'params',
+    'generation_time', 'duration', 'size', 'mtime', 'thumbnail_key', 'created_at',
+)
+
+
+def thumbnail_key(video_path):
+    """Content key of a video's thumbnail: changes whenever the file is replaced or rewritten."""
+    stat = os.stat(video_path)
+    identity = f"{os.path.abspath(video_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+
+def is_video_file(name):
+    """True for finished videos; hidden files and partial encodes (*.part.mp4) are skipped."""
+    return name.lower().endswith('.mp4') and not name.startswith('.') and not name.lower().endswith('.part.mp4')
+
+
+def probe_duration(video_path):
+    """Length of a video in seconds from its container header, or None."""
+    import cv2  # Only needed once new files are indexed, so not at startup
+    cap = cv2.VideoCapture(video_path)
+    try:
+        frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        fps = cap.get(cv2.CAP_PROP_FPS)
+    finally:
+        cap.release()
+    return frames / fps if frames and fps else None
+
+
+class Catalog:
+    """Index of the rendered videos in one output directory, kept in SQLite.
+
+    Renders are recorded with their prompt and parameters as they finish.
+    scan() brings the index in line with the directory by comparing
+    modification times and sizes, so only new or changed files are probed
+    and the grid can list thousands of past renders without decoding them.
+    """
+
+    def __init__(self, path, output_dir):
+        self.path = path
+        self.output_dir = output_dir
+        self._lock = threading.Lock()  # Renders are recorded from the export thread
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS videos (
+                    name TEXT PRIMARY KEY,
+                    project TEXT,
+                    sequence INTEGER,
+                    video_index INTEGER,
+                    prompt TEXT,
+                    params TEXT,
+                    generation_time REAL,
+                    duration REAL,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    thumbnail_key TEXT,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+
+    @classmethod
+    def for_output_dir(cls, output_dir):
+        return cls(os.path.join(output_dir, CATALOG_FILENAME), output_dir)
+
+    def record(self, video_path, prompt=None, params=None, generation_time=None):
+        """Adds or refreshes a video; prompt, params and generation time are kept if not given."""
+        name = os.path.basename(video_path)
+        stat = os.stat(video_path)
+        match = VIDEO_NAME.match(name)
+        row = (
+            name,
+            match.group('project') if match else None,
+            int(match.group('sequence')) if match else None,
+            int(match.group('index')) - 1 if match else None,
+            prompt,
+            json.dumps(params) if params is not None else None,
+            generation_time,
+            probe_duration(video_path),
+            stat.st_size,
+            stat.st_mtime,
+            thumbnail_key(video_path),
+            time.time(),
+        )
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"""
+                INSERT INTO videos ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})
+                ON CONFLICT(name) DO UPDATE SET
+                    prompt = COALESCE(excluded.prompt, prompt),
+                    params = COALESCE(excluded.params, params),
+                    generation_time = COALESCE(excluded.generation_time, generation_time),
+                    duration = excluded.duration,
+                    size = excluded.size,
+                    mtime = excluded.mtime,
+                    thumbnail_key = excluded.thumbnail_key
+                """,
+                row,
+            )
+
+    def scan(self):
+        """Indexes new and changed files and forgets deleted ones.
+
+        Returns (records of the added or changed videos, paths of the removed ones).
+        """
+        with self._lock:
+            known = {
+                name: (mtime, size)
+                for name, mtime, size in self._connection.execute("SELECT name, mtime, size FROM videos")
+            }
+
+        present = set()
+        changed = []
+        with os.scandir(self.output_dir) as entries:
+            for entry in entries:
+                if not is_video_file(entry.name) or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                present.add(entry.name)
+                if known.get(entry.name) != (stat.st_mtime, stat.st_size):
+                    changed.append(entry.name)
+
+        for name in changed:
+            try:
+                self.record(os.path.join(self.output_dir, name))
+            except OSError as e:
+                logging.warning(f"Could not index {name}: {e}")  # Removed while scanning
+
+        removed = sorted(known.keys() - present)
+        if removed:
+            with self._lock, self._connection:
+                self._connection.executemany("DELETE FROM videos WHERE name = ?", [(name,) for name in removed])
+        if changed or removed:
+            logging.info(f"Catalogue of {self.output_dir}: {len(changed)} new or changed, {len(removed)} removed")
+        return self.videos(changed), [os.path.join(self.output_dir, name) for name in removed]
+
+    def videos(self, names=None):
+        """Records of all videos (or of the given file names), oldest first."""
+        query = f"SELECT {', '.join(COLUMNS)} FROM videos"
+        with self._lock:
+            if names is None:
+                rows = self._connection.execute(f"{query} ORDER BY created_at").fetchall()
+            else:
+                rows = []
+                for name in names:
+                    rows += self._connection.execute(f"{query} WHERE name = ?", (name,)).fetchall()
+        records = []
+        for row in rows:
+            record = dict(zip(COLUMNS, row))
+            record['path'] = os.path.join(self.output_dir, record['name'])
+            record['params'] = json.loads(record['params']) if record['params'] else {}
+            records.append(record)
+        return records
+
+    def remove(self, video_path):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM videos WHERE name = ?", (os.path.basename(video_path),))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from importlib import metadata
+
+REQUIREMENTS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'requirements.txt')
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".autoplay", "environment.json")
+
+# What rendering imports; a package pinned in requirements.txt is checked against its pin
+RENDER_REQUIREMENTS = (
+    'torch',
+    'diffusers>=0.30.0',
+    'transformers',
+    'accelerate',
+    'sentencepiece',  # T5 tokenizer of the CogVideoX text encoder
+    'opencv-python',
+    'psutil',
+)
+
+REQUIREMENT = re.compile(r'^\s*(?P<name>[A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:(?P<op>==|>=)\s*(?P<version>[^\s;#]+))?')
+
+
+def normalize_name(name):
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def parse_requirement(line):
+    """(name, operator, version) of an 'name', 'name==x' or 'name>=x' line; None for comments and blanks."""
+    line = line.split('#', 1)[0].strip()
+    match = REQUIREMENT.match(line) if line else None
+    if not match:
+        return None
+    return match.group('name'), match.group('op'), match.group('version')
+
+
+def version_tuple(version):
+    """Numeric release segment of a version string: '2.4.1+cu121' -> (2, 4, 1)."""
+    match = re.match(r'\d+(\.\d+)*', version)
+    return tuple(int(part) for part in match.group(0).split('.')) if match else ()
+
+
+def read_manifest(requirements_path=REQUIREMENTS_PATH, requirements=RENDER_REQUIREMENTS):
+    """The render requirements, each replaced by its pin from requirements_path if it has one."""
+    pins = {}
+    if requirements_path and os.path.exists(requirements_path):
+        with open(requirements_path, encoding='utf-8') as f:
+            for line in f:
+                requirement = parse_requirement(line)
+                if requirement and requirement[1]:
+                    pins[normalize_name(requirement[0])] = line.split('#', 1)[0].strip()
+    return [pins.get(normalize_name(parse_requirement(line)[0]), line) for line in requirements]
+
+
+def unmet_requirements(manifest):
+    """Requirements that are not installed or older than their pin or minimum.
+
+    A version newer than its exact pin is only logged, so a newer torch
+    (e.g. a CUDA build) is not replaced with the pinned one.
+    """
+    unmet = []
+    for line in manifest:
+        name, op, version = parse_requirement(line)
+        try:
+            installed = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            unmet.append(line)
+            continue
+        if op and version_tuple(installed) < version_tuple(version):
+            unmet.append(line)
+        elif op == '==' and version_tuple(installed) != version_tuple(version):
+            logging.warning(f"{name} {installed} is installed, requirements.txt pins {version}")
+    return unmet
+
+
+def environment_key(requirements_path=REQUIREMENTS_PATH, manifest=()):
+    """Identifies an interpreter and the requirements it was checked against."""
+    digest = hashlib.sha256()
+    digest.update(sys.executable.encode('utf-8'))
+    if requirements_path and os.path.exists(requirements_path):
+        with open(requirements_path, 'rb') as f:
+            digest.update(f.read())
+    digest.update('\n'.join(manifest).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class EnvironmentCache:
+    """Remembers which environments already satisfied their requirements.
+
+    Entries are keyed by environment_key(), so a different interpreter or
+    an edited requirements.txt is checked again, and an environment that
+    passed once is not checked on every batch.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable environment cache {path}: {e}")
+
+    def is_verified(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def mark_verified(self, key):
+        with self._lock:
+            self._entries[key] = {"python": sys.executable, "verified_at": time.time()}
+            entries = json.dumps(self._entries, indent=2)
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(entries)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Failed to save environment cache {self.path}: {e}")
@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+STORE_FILENAME = ".autoplay_queue.sqlite3"
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class JobStore:
+    """Crash-safe record of queued render jobs, kept in SQLite next to the output.
+
+    Every queue item is written before it is rendered and moves through
+    pending -> running -> done/failed, or to cancelled when the queue is
+    cleared. The videos a job has finished are recorded as they are written,
+    so after a crash or restart the jobs that were pending or running are
+    handed back by unfinished_items() with only those videos to skip.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()  # Items are added from the GUI and updated from the render thread
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    item TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    error TEXT,
+                    finished_videos TEXT NOT NULL DEFAULT '[]',
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            columns = [row[1] for row in self._connection.execute("PRAGMA table_info(jobs)")]
+            if 'finished_videos' not in columns:  # Stores written before videos were recorded
+                self._connection.execute("ALTER TABLE jobs ADD COLUMN finished_videos TEXT NOT NULL DEFAULT '[]'")
+
+    @classmethod
+    def for_output_dir(cls, output_dir):
+        return cls(os.path.join(output_dir, STORE_FILENAME))
+
+    def add(self, item):
+        """Records a new pending job and stores its id in item['job_id']."""
+        now = time.time()
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO jobs (item, state, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                (json.dumps(item), PENDING, now, now),
+            )
+        item['job_id'] = cursor.lastrowid
+        return item['job_id']
+
+    def mark_running(self, item):
+        self._set_state(item, RUNNING)
+
+    def mark_done(self, item):
+        self._set_state(item, DONE)
+
+    def mark_failed(self, item, error):
+        self._set_state(item, FAILED, error)
+
+    def mark_cancelled(self, item):
+        self._set_state(item, CANCELLED)
+
+    def mark_video_done(self, item, video_idx):
+        """Records that video video_idx of the job is on disk, so a resumed run keeps it."""
+        job_id = item.get('job_id')
+        if job_id is None:
+            return
+        with self._lock, self._connection:
+            row = self._connection.execute("SELECT finished_videos FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            finished = sorted(set(json.loads(row[0])) | {video_idx})
+            self._connection.execute(
+                "UPDATE jobs SET finished_videos = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(finished), time.time(), job_id),
+            )
+
+    def unfinished_items(self):
+        """Returns pending and interrupted jobs in the order they were queued.
+
+        Each item's 'finished_videos' lists the videos its earlier run wrote;
+        a job that never started has none.
+        """
+        with self._lock, self._connection:
+            # A job still marked running was interrupted; it starts over as pending
+            self._connection.execute(
+                "UPDATE jobs SET state = ?, updated_at = ? WHERE state = ?", (PENDING, time.time(), RUNNING)
+            )
+            rows = self._connection.execute(
+                "SELECT id, item, finished_videos FROM jobs WHERE state = ? ORDER BY id", (PENDING,)
+            ).fetchall()
+        items = []
+        for job_id, item_json, finished_json in rows:
+            item = json.loads(item_json)
+            item['job_id'] = job_id
+            item['finished_videos'] = json.loads(finished_json)
+            items.append(item)
+        return items
+
+    def counts(self):
+        with self._lock:
+            rows = self._connection.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _set_state(self, item, state, error=None):
+        job_id = item.get('job_id')
+        if job_id is None:
+            return
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE jobs SET state = ?, error = ?, updated_at = ? WHERE id = ?",
+                (state, error, time.time(), job_id),
+            )
+        logging.info(f"Job {job_id} ({item.get('project_name')}) is {state}")
@@ -0,0 +1,221 @@
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+import psutil
+
+MIN_INTERVAL = 0.1
+MAX_INTERVAL = 10.0
+DEFAULT_INTERVAL = 1.0
+
+
+@dataclass
+class MetricsSample:
+    """One reading of host and GPU load; fields a backend cannot measure stay None."""
+    timestamp: float = 0.0
+    cpu_percent: float = None
+    ram_used_mb: float = None
+    ram_total_mb: float = None
+    gpu_percent: float = None
+    gpu_memory_percent: float = None  # Memory-controller utilisation
+    gpu_mem_used_mb: float = None
+    gpu_mem_total_mb: float = None
+    gpu_power_w: float = None
+
+
+class NvmlBackend:
+    """GPU utilisation, memory and power through the NVML bindings (nvidia-ml-py)."""
+    name = "nvml"
+
+    def __init__(self, device_index=0):
+        import pynvml  # Optional dependency; ImportError means "not available"
+        self._nvml = pynvml
+        pynvml.nvmlInit()
+        self._handle = pynvml.nvmlDeviceGetHandleByIndex(device_index)
+
+    def sample(self, sample):
+        nvml = self._nvml
+        utilization = nvml.nvmlDeviceGetUtilizationRates(self._handle)
+        memory = nvml.nvmlDeviceGetMemoryInfo(self._handle)
+        sample.gpu_percent = utilization.gpu
+        sample.gpu_memory_percent = utilization.memory
+        sample.gpu_mem_used_mb = memory.used / (1024 * 1024)
+        sample.gpu_mem_total_mb = memory.total / (1024 * 1024)
+        try:
+            sample.gpu_power_w = nvml.nvmlDeviceGetPowerUsage(self._handle) / 1000  # Milliwatts
+        except nvml.NVMLError:
+            pass  # Not every board reports power
+
+    def close(self):
+        self._nvml.nvmlShutdown()
+
+
+class TorchCudaBackend:
+    """GPU memory from the CUDA driver via torch; utilisation and power are unknown."""
+    name = "torch.cuda"
+
+    def __init__(self, device_index=0):
+        import torch
+        if not torch.cuda.is_available():
+            raise RuntimeError("CUDA is not available")
+        self._torch = torch
+        self.device_index = device_index
+
+    def sample(self, sample):
+        free, total = self._torch.cuda.mem_get_info(self.device_index)
+        sample.gpu_mem_used_mb = (total - free) / (1024 * 1024)
+        sample.gpu_mem_total_mb = total / (1024 * 1024)
+
+    def close(self):
+        pass
+
+
+class ProcBackend:
+    """CPU and RAM from /proc/stat and /proc/meminfo, without spawning anything."""
+    name = "proc"
+
+    def __init__(self):
+        if not os.path.exists('/proc/stat'):
+            raise RuntimeError("/proc is not available")
+        self._last_cpu = self._read_cpu()
+
+    @staticmethod
+    def _read_cpu():
+        with open('/proc/stat', encoding='ascii') as f:
+            values = [int(value) for value in f.readline().split()[1:]]
+        idle = values[3] + (values[4] if len(values) > 4 else 0)  # idle + iowait
+        return sum(values), idle
+
+    def sample(self, sample):
+        total, idle = self._read_cpu()
+        last_total, last_idle = self._last_cpu
+        self._last_cpu = (total, idle)
+        if total > last_total:
+            sample.cpu_percent = 100.0 * (1 - (idle - last_idle) / (total - last_total))
+
+        meminfo = {}
+        with open('/proc/meminfo', encoding='ascii') as f:
+            for line in f:
+                key, value = line.split(':', 1)
+                meminfo[key] = int(value.split()[0])  # Kilobytes
+        sample.ram_total_mb = meminfo['MemTotal'] / 1024
+        sample.ram_used_mb = (meminfo['MemTotal'] - meminfo.get('MemAvailable', meminfo['MemFree'])) / 1024
+
+    def close(self):
+        pass
+
+
+class PsutilBackend:
+    """CPU and RAM through psutil, for platforms without /proc."""
+    name = "psutil"
+
+    def __init__(self):
+        psutil.cpu_percent(interval=None)  # The first call only sets the baseline
+
+    def sample(self, sample):
+        memory = psutil.virtual_memory()
+        sample.cpu_percent = psutil.cpu_percent(interval=None)
+        sample.ram_used_mb = (memory.total - memory.available) / (1024 * 1024)
+        sample.ram_total_mb = memory.total / (1024 * 1024)
+
+    def close(self):
+        pass
+
+
+class NullBackend:
+    """Measures nothing; for tests and machines where sampling is unwanted."""
+    name = "null"
+
+    def sample(self, sample):
+        pass
+
+    def close(self):
+        pass
+
+
+GPU_BACKENDS = (NvmlBackend, TorchCudaBackend)
+HOST_BACKENDS = (ProcBackend, PsutilBackend)
+
+
+def default_backends():
+    """The first GPU backend and the first host backend that work on this machine."""
+    backends = []
+    for candidates in (GPU_BACKENDS, HOST_BACKENDS):
+        for backend_class in candidates:
+            try:
+                backends.append(backend_class())
+                break
+            except Exception as e:
+                logging.debug(f"Metrics backend {backend_class.name} unavailable: {e}")
+    logging.info(f"Metrics backends: {', '.join(backend.name for backend in backends) or 'none'}")
+    return backends
+
+
+class MetricsSampler:
+    """Samples host and GPU load on a background thread.
+
+    Every interval seconds (0.1 to 10) the backends fill in one
+    MetricsSample, which is kept as latest and passed to on_sample. A
+    backend that fails is logged once and dropped, so a missing driver
+    does not produce an error on every tick. Without explicit backends the
+    defaults are probed by the first sample, on the sampler thread, since
+    probing may import torch.
+    """
+
+    def __init__(self, interval=None, backends=None, on_sample=None):
+        if interval is None:
+            interval = float(os.getenv("AUTOPLAY_METRICS_INTERVAL", DEFAULT_INTERVAL))
+        self.set_interval(interval)
+        self.backends = None if backends is None else list(backends)  # None until the first sample
+        self._backends_lock = threading.Lock()
+        self.on_sample = on_sample
+        self.latest = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def set_interval(self, interval):
+        if not MIN_INTERVAL <= interval <= MAX_INTERVAL:
+            raise ValueError(f"Sampling interval must be between {MIN_INTERVAL} and {MAX_INTERVAL} seconds")
+        self.interval = interval
+
+    def sample(self):
+        """Takes one sample right away."""
+        with self._backends_lock:
+            if self.backends is None:
+                self.backends = default_backends()
+        sample = MetricsSample(timestamp=time.time())
+        for backend in list(self.backends):
+            try:
+                backend.sample(sample)
+            except Exception as e:
+                logging.warning(f"Metrics backend {backend.name} failed and is disabled: {e}")
+                self.backends.remove(backend)
+        self.latest = sample
+        return sample
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        self.stop()
+        with self._backends_lock:
+            for backend in self.backends or []:
+                backend.close()
+            self.backends = []
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            sample = self.sample()
+            if self.on_sample is not None:
+                self.on_sample(sample)
@@ -1,29 +1,77 @@
+import threading
 from PyQt6.QtCore import QObject, pyqtSignal
+from utils.scheduler import FAIR, JobScheduler
 
 class QueueManager(QObject):
     """Manages the queue of video generation tasks."""
     queue_updated = pyqtSignal()  # Signal to notify when the queue changes
 
-    def __init__(self):
+    def __init__(self, policy=FAIR):
         super().__init__()
-        self.queue = []
+        self.scheduler = JobScheduler(policy)
+        self.store = None  # Optional JobStore that makes the queue survive restarts
+        self._lock = threading.Lock()  # The render worker pops items from its own thread
+
+    def attach_store(self, store):
+        """Persists newly added items to store from now on.
+
+        Queued items carry job ids of the store they came from, so the store
+        can only be swapped while the queue is empty.
+        """
+        with self._lock:
+            if len(self.scheduler) > 0:
+                raise RuntimeError("Cannot switch the job store while jobs are queued")
+            self.store = store
+
+    def set_policy(self, policy):
+        """Switches the scheduling policy, keeping every queued item."""
+        with self._lock:
+            items = self.scheduler.items()
+            self.scheduler = JobScheduler(policy)
+            for item in items:
+                self.scheduler.push(item)
+        self.queue_updated.emit()
+
+    def resume_from_store(self):
+        """Queues the store's pending and interrupted jobs; returns how many were added."""
+        if self.store is None:
+            return 0
+        with self._lock:
+            queued_ids = {item.get('job_id') for item in self.scheduler.items()}
+        items = [item for item in self.store.unfinished_items() if item['job_id'] not in queued_ids]
+        for item in items:
+            self.add_to_queue(item)
+        return len(items)
 
     def add_to_queue(self, item):
         """Adds a new item to the queue."""
-        self.queue.append(item)
+        if self.store is not None and 'job_id' not in item:
+            self.store.add(item)
+        with self._lock:
+            self.scheduler.push(item)
         self.queue_updated.emit()  # Emit signal to notify queue has changed
 
     def get_next_item(self):
-        """Returns the next item in the queue."""
-        if self.queue:
-            return self.queue.pop(0)
-        return None
+        """Returns the next item according to the scheduling policy."""
+        with self._lock:
+            return self.scheduler.pop()
+
+    def pending_items(self):
+        """Returns a snapshot of the queued items."""
+        with self._lock:
+            return self.scheduler.items()
 
     def has_items(self):
         """Returns True if there are items left in the queue."""
-        return len(self.queue) > 0
+        with self._lock:
+            return len(self.scheduler) > 0
 
     def clear_queue(self):
-        """Clears the queue."""
-        self.queue.clear()
+        """Clears the queue; its jobs are cancelled in the store, so they are not resumed later."""
+        with self._lock:
+            items = self.scheduler.items()
+            self.scheduler.clear()
+        if self.store is not None:
+            for item in items:
+                self.store.mark_cancelled(item)
         self.queue_updated.emit()
@@ -0,0 +1,99 @@
+import heapq
+import itertools
+
+FAIR = "fair"
+FIFO = "fifo"
+SHORTEST_FIRST = "shortest-first"
+
+POLICIES = (FAIR, FIFO, SHORTEST_FIRST)
+
+
+def estimated_cost(item):
+    """Rough render cost of a queue item: frames x denoising steps x videos."""
+    return item['num_frames'] * item['num_inference_steps'] * item['num_videos']
+
+
+def owner_of(item):
+    """Items are shared out fairly between these (panel, project) owners."""
+    return (item.get('panel_id'), item.get('project_name'))
+
+
+class JobScheduler:
+    """Picks the next queue item by priority, then by policy.
+
+    Higher item['priority'] always goes first. Among equal priorities:
+      fair           - round-robin across panels/projects, FIFO within each
+      fifo           - strict queue order
+      shortest-first - lowest estimated_cost() first, queue order on ties
+
+    push() and pop() are O(log n) plus, for the fair policy, a scan over the
+    owners that currently have work queued.
+    """
+
+    def __init__(self, policy=FAIR):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown scheduling policy '{policy}', expected one of {', '.join(POLICIES)}")
+        self.policy = policy
+        self._counter = itertools.count()  # Preserves queue order between equal keys
+        self._heap = []  # Used by the fifo and shortest-first policies
+        self._owner_heaps = {}  # Used by the fair policy: owner -> heap of its items
+        self._rotation = []  # Owners with queued work, least recently served first
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def push(self, item):
+        priority = -item.get('priority', 0)
+        if self.policy == SHORTEST_FIRST:
+            entry = (priority, estimated_cost(item), next(self._counter), item)
+        else:
+            entry = (priority, next(self._counter), item)
+
+        if self.policy == FAIR:
+            owner = owner_of(item)
+            heap = self._owner_heaps.get(owner)
+            if heap is None:
+                heap = self._owner_heaps[owner] = []
+                self._rotation.append(owner)
+            heapq.heappush(heap, entry)
+        else:
+            heapq.heappush(self._heap, entry)
+        self._size += 1
+
+    def pop(self):
+        """Removes and returns the next item, or None when empty."""
+        if not self._size:
+            return None
+
+        if self.policy == FAIR:
+            # The owner whose best item has the highest priority goes next;
+            # among equals, the one that has waited longest since its last turn
+            position = min(range(len(self._rotation)), key=lambda i: self._owner_heaps[self._rotation[i]][0][0])
+            owner = self._rotation.pop(position)
+            heap = self._owner_heaps[owner]
+            entry = heapq.heappop(heap)
+            if heap:
+                self._rotation.append(owner)
+            else:
+                del self._owner_heaps[owner]
+        else:
+            entry = heapq.heappop(self._heap)
+
+        self._size -= 1
+        return entry[-1]
+
+    def items(self):
+        """Returns the queued items in the order they were pushed."""
+        if self.policy == FAIR:
+            entries = [entry for heap in self._owner_heaps.values() for entry in heap]
+        else:
+            entries = list(self._heap)
+        entries.sort(key=lambda entry: entry[-2])
+        return [entry[-1] for entry in entries]
+
+    def clear(self):
+        self._heap.clear()
+        self._owner_heaps.clear()
+        self._rotation.clear()
+        self._size = 0
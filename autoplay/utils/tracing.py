@@ -0,0 +1,310 @@
+import cProfile
+import json
+import logging
+import os
+import re
+import threading
+import time
+import psutil
+import torch
+
+CPROFILE = "cprofile"
+TORCH_PROFILER = "torch"
+PROFILERS = (CPROFILE, TORCH_PROFILER)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class _NullTrace:
+    """Stands in for a JobTrace while tracing is off; every call is a no-op."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def span(self, name, **args):
+        return NULL_SPAN
+
+    def add(self, name, start, end, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+NULL_TRACE = _NullTrace()
+
+
+class Span:
+    """Times a with-block and adds it to its trace."""
+
+    def __init__(self, trace, name, args):
+        self.trace = trace
+        self.name = name
+        self.args = args
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.trace.add(self.name, self.start, time.perf_counter(), **self.args)
+        return False
+
+
+class JobTrace:
+    """Collects the spans of one job and hands them to the tracer when the job ends.
+
+    Spans may be added from any thread (the export stage runs on its own).
+    Host memory is sampled whenever a span ends; GPU memory is the CUDA
+    allocator's peak since the job started.
+    """
+
+    def __init__(self, tracer, name, profiler=None, **args):
+        self.tracer = tracer
+        self.name = name
+        self.profiler = profiler
+        self.args = args
+        self.spans = []
+        self.start = None
+        self.end = None
+        self.rss_high_water = 0
+        self.cuda_high_water = None
+        self.capture_path = None
+        self._capture = None
+        self._process = psutil.Process()
+        self._lock = threading.Lock()
+
+    def span(self, name, **args):
+        return Span(self, name, args)
+
+    def add(self, name, start, end, **args):
+        """Records a stage measured elsewhere, with perf_counter() start and end times."""
+        rss = self._process.memory_info().rss
+        with self._lock:
+            self.spans.append({
+                "name": name,
+                "start": start,
+                "end": end,
+                "thread": threading.get_ident(),
+                "args": args,
+            })
+            self.rss_high_water = max(self.rss_high_water, rss)
+
+    def __enter__(self):
+        if torch.cuda.is_available():
+            torch.cuda.reset_peak_memory_stats()
+        self.rss_high_water = self._process.memory_info().rss
+        self._start_capture()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        self._stop_capture()
+        self.rss_high_water = max(self.rss_high_water, self._process.memory_info().rss)
+        if torch.cuda.is_available():
+            self.cuda_high_water = torch.cuda.max_memory_allocated()
+        self.tracer.write(self, error=str(exc) if exc is not None else None)
+        return False
+
+    def stages(self):
+        """Total seconds per stage name."""
+        totals = {}
+        with self._lock:
+            for span in self.spans:
+                totals[span["name"]] = totals.get(span["name"], 0.0) + span["end"] - span["start"]
+        return totals
+
+    def _start_capture(self):
+        try:
+            if self.profiler == CPROFILE:
+                self._capture = cProfile.Profile()
+                self._capture.enable()
+            elif self.profiler == TORCH_PROFILER:
+                activities = [torch.profiler.ProfilerActivity.CPU]
+                if torch.cuda.is_available():
+                    activities.append(torch.profiler.ProfilerActivity.CUDA)
+                self._capture = torch.profiler.profile(activities=activities)
+                self._capture.__enter__()
+        except Exception as e:
+            # cProfile refuses to start while another profiler is active
+            logging.warning(f"Could not start the {self.profiler} profiler for {self.name}: {e}")
+            self._capture = None
+
+    def _stop_capture(self):
+        if self._capture is None:
+            return
+        try:
+            if self.profiler == CPROFILE:
+                self._capture.disable()
+                path = self.tracer.capture_path(self.name, "prof")
+                self._capture.dump_stats(path)
+            else:
+                self._capture.__exit__(None, None, None)
+                path = self.tracer.capture_path(self.name, "torch.json")
+                self._capture.export_chrome_trace(path)
+            self.capture_path = path
+            logging.info(f"Wrote {self.profiler} profile of {self.name} to {path}")
+        except Exception as e:
+            logging.warning(f"Could not save the {self.profiler} profile of {self.name}: {e}")
+        finally:
+            self._capture = None
+
+
+class Tracer:
+    """Writes per-job stage timings and memory high-water marks.
+
+    Files ending in .json get Chrome trace events (open them in Perfetto or
+    chrome://tracing); any other path gets one JSON record per line. With no
+    path the tracer is off and job()/span() return shared no-op objects, so
+    instrumented code pays for little more than a method call.
+
+    profiler ("cprofile" or "torch") captures a profile of every job next to
+    the trace file; a job can also ask for one on its own.
+    """
+
+    def __init__(self, path=None, profiler=None):
+        if profiler is not None and profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler '{profiler}', expected one of {', '.join(PROFILERS)}")
+        self.path = path
+        self.profiler = profiler
+        self.chrome = bool(path) and path.endswith('.json')
+        self._epoch = time.time() - time.perf_counter()  # Lines up traces from several processes
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def job(self, name, profiler=None, **args):
+        """Returns a context manager that traces one job; args are stored with its record."""
+        if not self.path:
+            return NULL_TRACE
+        return JobTrace(self, name, profiler or self.profiler, **args)
+
+    def span(self, name, **args):
+        """Times a stage that belongs to no job (such as loading the pipeline) as a record of its own."""
+        if not self.path:
+            return NULL_SPAN
+        return JobTrace(self, name, **args)
+
+    def capture_path(self, name, extension):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        safe_name = re.sub(r'[^\w.-]', '_', name)
+        return os.path.join(directory, f"{safe_name}_{int(time.time() * 1000)}.{extension}")
+
+    def record(self, trace, error=None):
+        """The JSONL record of a finished job."""
+        with trace._lock:
+            spans = [
+                {
+                    "name": span["name"],
+                    "offset": span["start"] - trace.start,
+                    "duration": span["end"] - span["start"],
+                    "thread": span["thread"],
+                    **span["args"],
+                }
+                for span in trace.spans
+            ]
+        return {
+            "job": trace.name,
+            **trace.args,
+            "started": self._epoch + trace.start,
+            "duration": trace.end - trace.start,
+            "stages": trace.stages(),
+            "spans": spans,
+            "rss_high_water_mb": trace.rss_high_water / (1024 * 1024),
+            "cuda_high_water_mb": trace.cuda_high_water / (1024 * 1024) if trace.cuda_high_water is not None else None,
+            "profiler_capture": trace.capture_path,
+            "error": error,
+        }
+
+    def chrome_events(self, trace, error=None):
+        """Complete ("X") events for the job and its spans plus a memory counter."""
+        pid = os.getpid()
+        job_thread = threading.get_ident()
+
+        def timestamp(value):
+            return (self._epoch + value) * 1e6  # Microseconds
+
+        events = [{
+            "name": trace.name,
+            "cat": "job",
+            "ph": "X",
+            "ts": timestamp(trace.start),
+            "dur": (trace.end - trace.start) * 1e6,
+            "pid": pid,
+            "tid": job_thread,
+            "args": dict(trace.args, error=error, profiler_capture=trace.capture_path),
+        }]
+        with trace._lock:
+            for span in trace.spans:
+                events.append({
+                    "name": span["name"],
+                    "cat": "stage",
+                    "ph": "X",
+                    "ts": timestamp(span["start"]),
+                    "dur": (span["end"] - span["start"]) * 1e6,
+                    "pid": pid,
+                    "tid": span["thread"],
+                    "args": span["args"],
+                })
+        memory = {"rss_mb": trace.rss_high_water / (1024 * 1024)}
+        if trace.cuda_high_water is not None:
+            memory["cuda_mb"] = trace.cuda_high_water / (1024 * 1024)
+        events.append({"name": "memory high-water", "ph": "C", "ts": timestamp(trace.end), "pid": pid, "args": memory})
+        return events
+
+    def write(self, trace, error=None):
+        if self.chrome:
+            # JSON array format without the closing bracket, which trace viewers accept,
+            # so events can be appended as jobs finish
+            text = "".join(json.dumps(event) + ",\n" for event in self.chrome_events(trace, error))
+        else:
+            text = json.dumps(self.record(trace, error)) + "\n"
+        with self._lock:
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    if self.chrome and f.tell() == 0:
+                        text = "[\n" + text
+                    f.write(text)
+            except OSError as e:
+                logging.warning(f"Failed to write trace {self.path}: {e}")
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    """Returns the process-wide tracer, configured by AUTOPLAY_TRACE and AUTOPLAY_TRACE_PROFILER."""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(os.getenv("AUTOPLAY_TRACE"), os.getenv("AUTOPLAY_TRACE_PROFILER") or None)
+        return _tracer
+
+
+def configure_tracing(path=None, profiler=None):
+    """Replaces the process-wide tracer; the environment is updated so spawned workers trace too."""
+    global _tracer
+    tracer = Tracer(path, profiler)
+    for name, value in (("AUTOPLAY_TRACE", path), ("AUTOPLAY_TRACE_PROFILER", profiler)):
+        if value:
+            os.environ[name] = value
+        else:
+            os.environ.pop(name, None)
+    with _tracer_lock:
+        _tracer = tracer
+    return tracer